@@ -0,0 +1,131 @@
+"""
+Anti-entropy dla zbioru zrobionych paczek.
+
+Zamiast co chwilę rozsyłać cały zbiór `zrobione`, węzły porównują mały
+skrót — korzeń drzewa Merkle nad przestrzenią numerów paczek. Gdy korzenie
+się różnią, wymieniają tylko różniące się poddrzewa, aż dojdą do liści
+(przedziałów LEAF_SPAN paczek), których zawartość sumują.
+
+Geometria drzewa jest stała, więc wszystkie nody liczą te same węzły:
+liść `l` obejmuje paczki [l * LEAF_SPAN, (l + 1) * LEAF_SPAN), a węzeł
+(level, idx) ma dzieci (level + 1, idx * FANOUT + i).
+"""
+from __future__ import annotations
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Set
+
+
+LEAF_SPAN = 64
+FANOUT = 16
+DEPTH = 8          # liście leżą na poziomie DEPTH, korzeń na 0
+EMPTY = "0" * 16   # skrót pustego poddrzewa
+
+
+def _digest(data: str) -> str:
+    return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+
+
+class BatchMerkleTree:
+    """
+    Zbiór numerów paczek z utrzymywanym na bieżąco drzewem Merkle.
+    Zachowuje się jak set (in, len, iter, add, update), więc może zastąpić
+    zwykły zbiór `done_batches`.
+    """
+
+    def __init__(self, leaf_span: int = LEAF_SPAN, fanout: int = FANOUT, depth: int = DEPTH):
+        self.leaf_span = leaf_span
+        self.fanout = fanout
+        self.depth = depth
+        self._capacity = leaf_span * fanout ** depth
+        self._leaves: Dict[int, Set[int]] = {}
+        # level -> idx -> skrót; brak wpisu oznacza puste poddrzewo
+        self._nodes: List[Dict[int, str]] = [{} for _ in range(depth + 1)]
+        self._count = 0
+
+    # --- API zbioru ---
+    def __contains__(self, batch: int) -> bool:
+        items = self._leaves.get(batch // self.leaf_span)
+        return items is not None and batch in items
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        for items in self._leaves.values():
+            yield from items
+
+    def add(self, batch: int) -> bool:
+        """Dodaje paczkę; zwraca True, jeśli była nowa."""
+        return self.update((batch,)) > 0
+
+    def update(self, batches: Iterable[int]) -> int:
+        """Dodaje wiele paczek naraz (każdy liść przeliczany raz); zwraca liczbę nowych."""
+        before = self._count
+        touched = set()
+        for b in batches:
+            if not 0 <= b < self._capacity:
+                raise ValueError(f"Paczka {b} poza zakresem drzewa")
+            leaf = b // self.leaf_span
+            items = self._leaves.setdefault(leaf, set())
+            if b not in items:
+                items.add(b)
+                touched.add(leaf)
+                self._count += 1
+        for leaf in touched:
+            self._rehash(leaf)
+        return self._count - before
+
+    # --- API drzewa ---
+    def _rehash(self, leaf: int):
+        self._nodes[self.depth][leaf] = _digest(",".join(map(str, sorted(self._leaves[leaf]))))
+        idx = leaf
+        for level in range(self.depth - 1, -1, -1):
+            idx //= self.fanout
+            self._nodes[level][idx] = _digest("".join(self.children(level, idx)))
+
+    def node(self, level: int, idx: int) -> str:
+        return self._nodes[level].get(idx, EMPTY)
+
+    def root(self) -> str:
+        return self.node(0, 0)
+
+    def children(self, level: int, idx: int) -> List[str]:
+        """Skróty dzieci węzła (level, idx) — dokładnie FANOUT wartości."""
+        first = idx * self.fanout
+        return [self.node(level + 1, first + i) for i in range(self.fanout)]
+
+    def leaf_items(self, leaf: int) -> Set[int]:
+        return set(self._leaves.get(leaf, ()))
+
+    def diff_children(self, level: int, idx: int, theirs: List[str]) -> List[int]:
+        """Indeksy dzieci (na poziomie level + 1), których skróty różnią się od cudzych."""
+        if len(theirs) != self.fanout:
+            raise ValueError("Niezgodna geometria drzewa")
+        first = idx * self.fanout
+        return [first + i for i, h in enumerate(self.children(level, idx)) if h != theirs[i]]
+
+    def is_leaf_level(self, level: int) -> bool:
+        return level == self.depth
+
+
+def format_ranges(batches: Iterable[int]) -> List[str]:
+    """Zwija numery paczek w przedziały: [0, 1, 2, 5, 7, 8] -> ['0-2', '5', '7-8']."""
+    out = []
+    start = prev = None
+    for b in sorted(batches):
+        if prev is not None and b == prev + 1:
+            prev = b
+            continue
+        if start is not None:
+            out.append(f"{start}-{prev}" if prev != start else str(start))
+        start = prev = b
+    if start is not None:
+        out.append(f"{start}-{prev}" if prev != start else str(start))
+    return out
+
+
+def parse_ranges(text: str) -> Iterator[int]:
+    """Odwrotność format_ranges dla listy rozdzielonej przecinkami."""
+    for part in filter(None, text.split(",")):
+        lo, _, hi = part.partition("-")
+        yield from range(int(lo), int(hi or lo) + 1)
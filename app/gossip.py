@@ -0,0 +1,406 @@
+"""
+Transport gossip (epidemiczny) nad UDP — wspólny dla czatu i łamacza.
+
+* Każdy node zna tylko częściowy widok sieci (max VIEW_SIZE peerów),
+  uzupełniany próbkami peerów doklejanymi do heartbeatów.
+* broadcast() wysyła wiadomość do losowych k ≈ log2(N) + 1 peerów z widoku,
+  a każdy odbiorca przekazuje ją dalej (z limitem TTL). Duplikaty są
+  odrzucane po identyfikatorze wiadomości.
+* Peer, od którego nic nie przyszło przez PEER_TIMEOUT, wypada z widoku.
+* Odkrywanie: multicast (opcjonalnie) albo lista seedów `ip[:port]`
+  dla sieci bez multicastu.
+* Wiadomości ważne (reliable=True) są potwierdzane na każdym skoku (ACK)
+  i retransmitowane z wykładniczym backoffem; po MAX_RETRIES próbach do
+  danego peera wybieramy innego z widoku. Liczniki w `stats`.
+  flush() czeka, aż wszystkie takie wiadomości zostaną potwierdzone —
+  przed wyjściem z procesu, bo retransmisje robi wątek-demon.
+
+Każdy datagram zaczyna się od `<namespace>/` — aplikacje dzielące sieć
+(czat, łamacz) mają różne przestrzenie nazw, a obce datagramy są odrzucane.
+
+Format datagramów (tekst, po prefiksie przestrzeni nazw):
+    HB:<port>:<próbka ip@port;...>:<meta>      heartbeat / ogłoszenie
+    G:<msg_id>:<ttl>:<origin>:<payload>        wiadomość epidemiczna
+    GR:<msg_id>:<ttl>:<origin>:<payload>       jw., z potwierdzeniem
+    U:<origin>:<payload>                       wiadomość bezpośrednia
+    UR:<msg_id>:<origin>:<payload>             jw., z potwierdzeniem
+    ACK:<msg_id>                               potwierdzenie GR/UR
+gdzie <origin> to `ip@port` autora wiadomości.
+"""
+from __future__ import annotations
+import math
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Addr = Tuple[str, int]
+
+VIEW_SIZE = 16
+HEARTBEAT_INTERVAL = 2
+PEER_TIMEOUT = 10
+SAMPLE_SIZE = 3
+SEEN_TTL = 120
+MIN_FANOUT = 2
+RETRY_BASE = 0.2      # pierwszy timeout retransmisji [s], potem x2
+MAX_RETRIES = 5
+RETRY_TICK = 0.05
+# pełny harmonogram prób do jednego peera (0.2 + 0.4 + ... + 6.4 s) — plus jeden peer zastępczy
+FLUSH_TIMEOUT = 2 * RETRY_BASE * (2 ** (MAX_RETRIES + 1) - 1)
+
+
+def _node_id(addr: Addr) -> str:
+    return f"{addr[0]}@{addr[1]}"
+
+
+def _parse_node_id(text: str) -> Addr:
+    ip, _, port = text.partition("@")
+    return ip, int(port)
+
+
+def parse_peer(text: str, default_port: int) -> Addr:
+    """'10.0.0.5' albo '10.0.0.5:50002' -> (ip, port)."""
+    host, _, port = text.strip().partition(":")
+    return host, int(port) if port else default_port
+
+
+class GossipNode:
+    """
+    Node gossip. on_message(payload, origin_ip) jest wołane dla każdej nowej
+    wiadomości (epidemicznej lub bezpośredniej). heartbeat_meta() może zwrócić
+    krótki tekst doklejany do heartbeatów; trafia on do on_heartbeat(ip, meta)
+    u sąsiadów.
+    """
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        on_message: Callable[[str, str], None],
+        seeds: Iterable[Addr] = (),
+        discovery: Optional[Addr] = None,
+        view_size: int = VIEW_SIZE,
+        heartbeat_meta: Optional[Callable[[], str]] = None,
+        on_heartbeat: Optional[Callable[[str, str], None]] = None,
+        namespace: str = "gossip",
+    ):
+        if not namespace or "/" in namespace or ":" in namespace:
+            raise ValueError(f"Niepoprawna przestrzeń nazw: {namespace!r}")
+        self.namespace = namespace
+        self._prefix = f"{namespace}/"
+        self.ip = ip
+        self.port = port
+        self.node_id = _node_id((ip, port))
+        self.on_message = on_message
+        self.heartbeat_meta = heartbeat_meta
+        self.on_heartbeat = on_heartbeat
+        self.view_size = view_size
+        self.discovery = discovery
+        self.seeds: List[Addr] = list(seeds)
+
+        self.view: Dict[Addr, float] = {}          # peer -> kiedy ostatnio coś przysłał
+        self.origins: Dict[str, float] = {}        # autorzy (ip@port) wiadomości — do szacowania N
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._boot = f"{random.getrandbits(32):08x}"
+        self._seq = 0
+        self.lock = threading.Lock()
+        self.stopped = False
+        self.stats = {
+            "sent": 0, "received": 0, "duplicates": 0,
+            "retransmits": 0, "acked": 0, "gave_up": 0, "foreign": 0,
+        }
+        # (msg_id, peer) -> [tekst, liczba prób, termin następnej próby, czy można zmienić peera]
+        self._pending: Dict[Tuple[str, Addr], list] = {}
+        self._tried: Dict[str, set] = {}   # msg_id -> peery, do których już próbowaliśmy
+        self._handling = 0   # datagramy w trakcie obsługi (odebrane, jeszcze nie przekazane dalej)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("", port))
+
+        self.mcast_sock = None
+        if discovery:
+            group, mport = discovery
+            self.mcast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            self.mcast_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.mcast_sock.bind(("", mport))
+            mreq = socket.inet_aton(group) + socket.inet_aton("0.0.0.0")
+            self.mcast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+
+    def start(self) -> "GossipNode":
+        threading.Thread(target=self._listen, args=(self.sock,), daemon=True).start()
+        if self.mcast_sock:
+            threading.Thread(target=self._listen, args=(self.mcast_sock,), daemon=True).start()
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        threading.Thread(target=self._retransmit_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """
+        Czeka, aż wszystkie wiadomości reliable (własne i przekazywane dalej)
+        zostaną potwierdzone albo porzucone. False, jeśli minął timeout.
+        """
+        deadline = time.time() + timeout
+        while True:
+            with self.lock:
+                if not self._pending and not self._handling:
+                    return True
+            if time.time() >= deadline:
+                return False
+            time.sleep(RETRY_TICK)
+
+    # === API ===
+    def peers(self) -> List[Addr]:
+        with self.lock:
+            return list(self.view)
+
+    def estimate_size(self) -> int:
+        """Szacowana liczba nodów: autorzy ostatnich wiadomości + widok + my."""
+        with self.lock:
+            return max(len(self.view), len(self.origins)) + 1
+
+    def fanout(self) -> int:
+        n = self.estimate_size()
+        return max(MIN_FANOUT, math.ceil(math.log2(n)) + 1)
+
+    def broadcast(self, payload: str, reliable: bool = False) -> str:
+        """Rozsyła wiadomość epidemicznie; zwraca jej identyfikator."""
+        msg_id = self._next_id()
+        ttl = math.ceil(math.log2(self.estimate_size())) + 2
+        self._forward(msg_id, ttl, self.node_id, payload, exclude=None, reliable=reliable)
+        return msg_id
+
+    def send(self, ip: str, payload: str, port: Optional[int] = None, reliable: bool = False):
+        """Wiadomość bezpośrednia do jednego noda."""
+        peer = (ip, port or self._port_of(ip))
+        if not reliable:
+            self._sendto(f"U:{self.node_id}:{payload}", peer)
+            return
+        msg_id = self._next_id()
+        text = f"UR:{msg_id}:{self.node_id}:{payload}"
+        self._sendto(text, peer)
+        self._track(msg_id, peer, text, replaceable=False)
+
+    # === WEWNĘTRZNE ===
+    def _next_id(self) -> str:
+        # numer sekwencyjny + losowy znacznik startu -> unikalne także po restarcie
+        with self.lock:
+            self._seq += 1
+            msg_id = f"{self.node_id}-{self._boot}-{self._seq}"
+            self._seen[msg_id] = time.time()
+        return msg_id
+
+    def _port_of(self, ip: str) -> int:
+        with self.lock:
+            for peer_ip, peer_port in self.view:
+                if peer_ip == ip:
+                    return peer_port
+        return self.port
+
+    def _sendto(self, text: str, addr: Addr):
+        try:
+            self.sock.sendto((self._prefix + text).encode(), addr)
+        except OSError:
+            return
+        with self.lock:
+            self.stats["sent"] += 1
+
+    def _forward(self, msg_id: str, ttl: int, origin: str, payload: str, exclude: Optional[Addr],
+                 reliable: bool = False):
+        origin_addr = _parse_node_id(origin)
+        fanout = self.fanout()
+        with self.lock:
+            candidates = [p for p in self.view if p != exclude and p != origin_addr]
+            targets = random.sample(candidates, min(fanout, len(candidates)))
+            # bez odbiorców nic nie śledzimy — wpis w _tried nigdy by nie został usunięty
+            if reliable and targets:
+                self._tried[msg_id] = {exclude, origin_addr}
+        text = f"{'GR' if reliable else 'G'}:{msg_id}:{ttl}:{origin}:{payload}"
+        for peer in targets:
+            self._sendto(text, peer)
+            if reliable:
+                self._track(msg_id, peer, text)
+
+    def _track(self, msg_id: str, peer: Addr, text: str, replaceable: bool = True):
+        with self.lock:
+            self._pending[(msg_id, peer)] = [text, 0, time.time() + RETRY_BASE, replaceable]
+            self._tried.setdefault(msg_id, set()).add(peer)
+
+    def _retransmit_loop(self):
+        while not self.stopped:
+            time.sleep(RETRY_TICK)
+            now = time.time()
+            resend = []
+            with self.lock:
+                for key, entry in list(self._pending.items()):
+                    text, attempts, due, replaceable = entry
+                    if due > now:
+                        continue
+                    if attempts < MAX_RETRIES:
+                        entry[1] = attempts + 1
+                        entry[2] = now + RETRY_BASE * 2 ** entry[1]
+                        resend.append((text, key[1]))
+                        self.stats["retransmits"] += 1
+                        continue
+                    # peer nie odpowiada — oddajemy wiadomość innemu z widoku
+                    del self._pending[key]
+                    self.stats["gave_up"] += 1
+                    msg_id = key[0]
+                    tried = self._tried.get(msg_id, set())
+                    spare = [p for p in self.view if p not in tried and p != key[1]]
+                    if replaceable and spare:
+                        peer = random.choice(spare)
+                        tried.add(peer)
+                        self._pending[(msg_id, peer)] = [text, 0, now + RETRY_BASE, True]
+                        resend.append((text, peer))
+                    elif not any(k[0] == msg_id for k in self._pending):
+                        self._tried.pop(msg_id, None)
+            for text, peer in resend:
+                self._sendto(text, peer)
+
+    def _ack(self, msg_id: str, peer: Addr):
+        with self.lock:
+            if self._pending.pop((msg_id, peer), None) is None:
+                return
+            self.stats["acked"] += 1
+            if not any(k[0] == msg_id for k in self._pending):
+                self._tried.pop(msg_id, None)
+
+
+    def _is_self(self, peer: Addr) -> bool:
+        return peer == (self.ip, self.port)
+
+    def _touch(self, peer: Addr) -> bool:
+        """Zapisuje kontakt od peera; przy pełnym widoku wyrzuca najstarszy wpis."""
+        if self._is_self(peer):
+            return False
+        with self.lock:
+            new = peer not in self.view
+            if new and len(self.view) >= self.view_size:
+                stalest = min(self.view, key=self.view.get)
+                del self.view[stalest]
+            self.view[peer] = time.time()
+        return new
+
+    def _learn(self, peer: Addr):
+        """Peer znany z próbki — dopisujemy tylko gdy jest miejsce, z 'postarzonym' czasem."""
+        if self._is_self(peer):
+            return
+        with self.lock:
+            if peer not in self.view and len(self.view) < self.view_size:
+                self.view[peer] = time.time() - PEER_TIMEOUT / 2
+
+    def _heartbeat_text(self) -> str:
+        with self.lock:
+            peers = list(self.view)
+        sample = random.sample(peers, min(SAMPLE_SIZE, len(peers)))
+        sample_str = ";".join(f"{ip}@{port}" for ip, port in sample)
+        meta = self.heartbeat_meta() if self.heartbeat_meta else ""
+        return f"HB:{self.port}:{sample_str}:{meta}"
+
+    def _heartbeat_loop(self):
+        while not self.stopped:
+            now = time.time()
+            with self.lock:
+                for peer in [p for p, t in self.view.items() if now - t > PEER_TIMEOUT]:
+                    del self.view[peer]
+                for ip in [o for o, t in self.origins.items() if now - t > SEEN_TTL]:
+                    del self.origins[ip]
+                while self._seen and now - next(iter(self._seen.values())) > SEEN_TTL:
+                    self._seen.popitem(last=False)
+                peers = list(self.view)
+
+            text = self._heartbeat_text()
+            for peer in peers:
+                self._sendto(text, peer)
+            # mały widok -> ogłaszamy się seedom i grupie multicast
+            if len(peers) < max(MIN_FANOUT, self.view_size // 2):
+                for seed in self.seeds:
+                    if seed not in peers:
+                        self._sendto(text, seed)
+                if self.discovery:
+                    self._sendto(text, self.discovery)
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def _listen(self, sock: socket.socket):
+        while not self.stopped:
+            try:
+                data, addr = sock.recvfrom(65535)
+            except Exception:
+                continue
+            with self.lock:
+                self._handling += 1
+            try:
+                self._handle(data.decode(), addr)
+            except Exception:
+                pass
+            finally:
+                with self.lock:
+                    self._handling -= 1
+
+    def _handle(self, text: str, addr: Addr):
+        if not text.startswith(self._prefix):
+            # inna aplikacja na tej samej grupie/porcie — nie mieszamy widoków
+            with self.lock:
+                self.stats["foreign"] += 1
+            return
+        kind, _, rest = text[len(self._prefix):].partition(":")
+        with self.lock:
+            self.stats["received"] += 1
+
+        if kind == "HB":
+            port, sample, meta = rest.split(":", 2)
+            peer = (addr[0], int(port))
+            if self._is_self(peer):
+                return
+            if self._touch(peer):
+                # nowy peer -> odpowiadamy od razu, żeby też nas poznał
+                self._sendto(self._heartbeat_text(), peer)
+            for entry in filter(None, sample.split(";")):
+                ip, _, p = entry.partition("@")
+                self._learn((ip, int(p)))
+            if self.on_heartbeat:
+                self.on_heartbeat(addr[0], meta)
+
+        elif kind in ("G", "GR"):
+            msg_id, ttl, origin, payload = rest.split(":", 3)
+            sender = (addr[0], addr[1])
+            self._touch(sender)
+            if kind == "GR":
+                # ACK także dla duplikatu — nadawca mógł nie dostać poprzedniego
+                self._sendto(f"ACK:{msg_id}", sender)
+            with self.lock:
+                if msg_id in self._seen:
+                    self.stats["duplicates"] += 1
+                    return
+                self._seen[msg_id] = time.time()
+                self.origins[origin] = time.time()
+            if origin != self.node_id:
+                self.on_message(payload, _parse_node_id(origin)[0])
+            if int(ttl) > 1:
+                self._forward(msg_id, int(ttl) - 1, origin, payload, exclude=sender,
+                              reliable=kind == "GR")
+
+        elif kind == "U":
+            origin, payload = rest.split(":", 1)
+            self._touch((addr[0], addr[1]))
+            self.on_message(payload, _parse_node_id(origin)[0])
+
+        elif kind == "UR":
+            msg_id, origin, payload = rest.split(":", 2)
+            sender = (addr[0], addr[1])
+            self._touch(sender)
+            self._sendto(f"ACK:{msg_id}", sender)
+            with self.lock:
+                if msg_id in self._seen:
+                    self.stats["duplicates"] += 1
+                    return
+                self._seen[msg_id] = time.time()
+            self.on_message(payload, _parse_node_id(origin)[0])
+
+        elif kind == "ACK":
+            self._ack(rest, (addr[0], addr[1]))
@@ -0,0 +1,254 @@
+"""
+Rejestr backendów haszujących używanych przez aplikację do łamania hashy.
+
+Każdy backend deklaruje swój względny koszt (SHA-1 = 1.0, zmierzony czas
+hexdigest() na kandydata), dzięki czemu rozmiar paczki skaluje się
+automatycznie — paczka PBKDF2 liczy się mniej więcej tyle samo czasu co
+paczka SHA-1. Paczka nie spada jednak poniżej MIN_BATCH_SIZE, bo każda
+kosztuje rundę TASK_START/TASK_DONE i aktualizację drzewa Merkle.
+
+Spec backendu to tekst przesyłany w sieci razem z hashem, np.:
+    sha1
+    salted,algo=sha256,salt=73616c74,mode=prefix
+    pbkdf2,algo=sha256,salt=73616c74,iter=10000
+"""
+from __future__ import annotations
+import functools
+import hashlib
+import struct
+from typing import Callable, Dict, Optional
+
+
+HASHERS: Dict[str, type] = {}
+
+MIN_BATCH_SIZE = 64
+
+# Koszt jednej iteracji PBKDF2 względem hexdigest() SHA-1 (pomiar)
+PBKDF2_ITER_COST = {"md5": 0.4, "sha1": 0.55, "sha256": 0.45, "sha512": 1.2}
+SCRYPT_COST = 0.45   # na jednostkę n * r * p
+
+
+def register_hasher(name: str) -> Callable[[type], type]:
+    """Dekorator rejestrujący klasę backendu pod podaną nazwą."""
+    def wrap(cls: type) -> type:
+        cls.name = name
+        HASHERS[name] = cls
+        return cls
+    return wrap
+
+
+class Hasher:
+    """Bazowy backend: zamienia hasło na hex-digest."""
+
+    name = "base"
+    cost = 1.0
+
+    def hexdigest(self, pwd: str) -> str:
+        raise NotImplementedError
+
+    def params(self) -> Dict[str, str]:
+        """Parametry backendu (poza nazwą) potrzebne do odtworzenia go z spec."""
+        return {}
+
+    @property
+    def spec(self) -> str:
+        parts = [self.name] + [f"{k}={v}" for k, v in self.params().items()]
+        return ",".join(parts)
+
+    def batch_size(self, base_size: int) -> int:
+        """Rozmiar paczki przeskalowany kosztem backendu (min. MIN_BATCH_SIZE)."""
+        return min(base_size, max(MIN_BATCH_SIZE, int(base_size / self.cost)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.spec!r})"
+
+
+# === SZYBKIE SKRÓTY ===
+class DigestHasher(Hasher):
+    """Zwykły skrót hashlib: H(pwd)."""
+
+    algo = "sha1"
+
+    def __init__(self):
+        self._new = getattr(hashlib, self.algo)
+
+    def hexdigest(self, pwd: str) -> str:
+        return self._new(pwd.encode()).hexdigest()
+
+
+@register_hasher("md5")
+class Md5Hasher(DigestHasher):
+    algo = "md5"
+    cost = 1.2
+
+
+@register_hasher("sha1")
+class Sha1Hasher(DigestHasher):
+    algo = "sha1"
+    cost = 1.0
+
+
+@register_hasher("sha256")
+class Sha256Hasher(DigestHasher):
+    algo = "sha256"
+    cost = 1.1
+
+
+@register_hasher("sha512")
+class Sha512Hasher(DigestHasher):
+    algo = "sha512"
+    cost = 1.8
+
+
+def _digest_constructor(algo: str) -> Callable:
+    """Konstruktor skrótu z hashlib; ValueError, gdy algorytm jest nieznany lub nie ma stałej długości."""
+    if algo not in hashlib.algorithms_available:
+        raise ValueError(f"Nieznany algorytm skrótu: {algo}")
+    new = getattr(hashlib, algo, None) or functools.partial(hashlib.new, algo)
+    try:
+        new(b"").hexdigest()
+    except TypeError:
+        raise ValueError(f"Algorytm {algo} nie nadaje się do haszowania haseł") from None
+    return new
+
+
+# === SOLONE ===
+@register_hasher("salted")
+class SaltedHasher(Hasher):
+    """
+    Skrót z solą: mode=prefix -> H(salt + pwd), mode=suffix -> H(pwd + salt).
+    W trybie prefix sól jest haszowana raz, a dla każdego kandydata
+    kopiujemy gotowy stan (midstate) przez copy() zamiast liczyć sól od nowa.
+    """
+
+    def __init__(self, algo: str = "sha1", salt: str = "", mode: str = "prefix"):
+        if mode not in ("prefix", "suffix"):
+            raise ValueError(f"Nieznany tryb soli: {mode}")
+        self.algo = algo
+        self.salt = bytes.fromhex(salt)
+        self.mode = mode
+        self._new = _digest_constructor(algo)
+        self._midstate = self._new(self.salt)
+        self.cost = HASHERS[algo].cost if algo in HASHERS else 1.0
+
+    def params(self) -> Dict[str, str]:
+        return {"algo": self.algo, "salt": self.salt.hex(), "mode": self.mode}
+
+    def hexdigest(self, pwd: str) -> str:
+        if self.mode == "prefix":
+            h = self._midstate.copy()
+            h.update(pwd.encode())
+            return h.hexdigest()
+        return self._new(pwd.encode() + self.salt).hexdigest()
+
+
+# === NTLM ===
+def _md4(data: bytes) -> bytes:
+    """Czysto pythonowe MD4 (RFC 1320) — OpenSSL 3 często go już nie udostępnia."""
+    def rol(x, n):
+        x &= 0xFFFFFFFF
+        return ((x << n) | (x >> (32 - n))) & 0xFFFFFFFF
+
+    msg = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    a, b, c, d = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476
+    for off in range(0, len(msg), 64):
+        x = struct.unpack("<16I", msg[off:off + 64])
+        aa, bb, cc, dd = a, b, c, d
+        for i in (0, 4, 8, 12):
+            a = rol(a + ((b & c) | (~b & d)) + x[i], 3)
+            d = rol(d + ((a & b) | (~a & c)) + x[i + 1], 7)
+            c = rol(c + ((d & a) | (~d & b)) + x[i + 2], 11)
+            b = rol(b + ((c & d) | (~c & a)) + x[i + 3], 19)
+        for i in (0, 1, 2, 3):
+            a = rol(a + ((b & c) | (b & d) | (c & d)) + x[i] + 0x5A827999, 3)
+            d = rol(d + ((a & b) | (a & c) | (b & c)) + x[i + 4] + 0x5A827999, 5)
+            c = rol(c + ((d & a) | (d & b) | (a & b)) + x[i + 8] + 0x5A827999, 9)
+            b = rol(b + ((c & d) | (c & a) | (d & a)) + x[i + 12] + 0x5A827999, 13)
+        for i in (0, 2, 1, 3):
+            a = rol(a + (b ^ c ^ d) + x[i] + 0x6ED9EBA1, 3)
+            d = rol(d + (a ^ b ^ c) + x[i + 8] + 0x6ED9EBA1, 9)
+            c = rol(c + (d ^ a ^ b) + x[i + 4] + 0x6ED9EBA1, 11)
+            b = rol(b + (c ^ d ^ a) + x[i + 12] + 0x6ED9EBA1, 15)
+        a = (a + aa) & 0xFFFFFFFF
+        b = (b + bb) & 0xFFFFFFFF
+        c = (c + cc) & 0xFFFFFFFF
+        d = (d + dd) & 0xFFFFFFFF
+    return struct.pack("<4I", a, b, c, d)
+
+
+@register_hasher("ntlm")
+class NtlmHasher(Hasher):
+    """NTLM: MD4(UTF-16LE(pwd)). Używa hashlib jeśli ma MD4, inaczej _md4."""
+
+    cost = 1.0
+
+    def __init__(self):
+        try:
+            hashlib.new("md4", b"")
+            self._digest = lambda data: hashlib.new("md4", data).digest()
+        except ValueError:
+            self._digest = _md4
+            self.cost = 30.0
+
+    def hexdigest(self, pwd: str) -> str:
+        return self._digest(pwd.encode("utf-16-le")).hex()
+
+
+# === WOLNE KDF ===
+@register_hasher("pbkdf2")
+class Pbkdf2Hasher(Hasher):
+    """PBKDF2-HMAC; koszt liniowy w liczbie iteracji (PBKDF2_ITER_COST na iterację)."""
+
+    def __init__(self, algo: str = "sha256", salt: str = "", iter: str = "10000"):
+        self.algo = algo
+        self.salt = bytes.fromhex(salt)
+        self.iterations = int(iter)
+        if self.iterations < 1:
+            raise ValueError("Liczba iteracji musi być dodatnia")
+        # próbne wywołanie — nieobsługiwany algo wyjdzie teraz, a nie w wątku liczącym
+        try:
+            hashlib.pbkdf2_hmac(algo, b"", b"", 1)
+        except ValueError:
+            raise ValueError(f"Nieobsługiwany algorytm PBKDF2: {algo}") from None
+        self.cost = PBKDF2_ITER_COST.get(algo, 1.0) * self.iterations
+
+    def params(self) -> Dict[str, str]:
+        return {"algo": self.algo, "salt": self.salt.hex(), "iter": str(self.iterations)}
+
+    def hexdigest(self, pwd: str) -> str:
+        return hashlib.pbkdf2_hmac(self.algo, pwd.encode(), self.salt, self.iterations).hex()
+
+
+@register_hasher("scrypt")
+class ScryptHasher(Hasher):
+    """scrypt; koszt rośnie liniowo z n * r * p."""
+
+    def __init__(self, salt: str = "", n: str = "16384", r: str = "8", p: str = "1"):
+        self.salt = bytes.fromhex(salt)
+        self.n, self.r, self.p = int(n), int(r), int(p)
+        if self.n < 2 or self.n & (self.n - 1) or self.r < 1 or self.p < 1:
+            raise ValueError("scrypt wymaga n = potęga 2 (> 1) oraz r, p >= 1")
+        self.cost = SCRYPT_COST * self.n * self.r * self.p
+
+    def params(self) -> Dict[str, str]:
+        return {"salt": self.salt.hex(), "n": str(self.n), "r": str(self.r), "p": str(self.p)}
+
+    def hexdigest(self, pwd: str) -> str:
+        return hashlib.scrypt(
+            pwd.encode(), salt=self.salt, n=self.n, r=self.r, p=self.p,
+            maxmem=256 * self.n * self.r * self.p,
+        ).hex()
+
+
+def hasher_from_spec(spec: Optional[str]) -> Hasher:
+    """Tworzy backend z tekstowego spec (patrz opis modułu). Pusty spec -> sha1."""
+    if not spec:
+        spec = "sha1"
+    name, *parts = spec.strip().split(",")
+    if name not in HASHERS:
+        raise ValueError(f"Nieznany backend hasha: {name}")
+    kwargs = {}
+    for part in parts:
+        k, _, v = part.partition("=")
+        kwargs[k] = v
+    return HASHERS[name](**kwargs)
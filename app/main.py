@@ -2,8 +2,8 @@
 import socket
 import threading
 import time
-import hashlib
 import argparse
+import random
 import re
 import sys
 from pathlib import Path
@@ -12,17 +12,26 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from library.factory import GeneratorFactory
+from library.progress import CHECK_EVERY, CancellationToken, RateEstimator
+from app.hashers import hasher_from_spec
+from app.antientropy import BatchMerkleTree, format_ranges, parse_ranges
+from app.gossip import GossipNode, parse_peer
 
 
 # === USTAWIENIA ===
 MULTICAST_GROUP = "224.0.0.251"
 MULTICAST_PORT = 50001
 TASK_PORT = 50002
-PING_INTERVAL = 3
-SYNC_INTERVAL = 8
+GOSSIP_NAMESPACE = "crack"     # czat (auto_gossip.py) ma własną — nie mieszamy widoków
 TASK_BATCH_SIZE = 1_000_000
 TASK_TIMEOUT = 30
+LEASE_TTL = 20            # dzierżawa paczki wygasa, jeśli nie jest odnawiana tyle sekund
+LEASE_RENEW = 5           # co ile sekund pracujący node odnawia dzierżawę (z aktualnym offsetem)
 SYNC_WAIT_TIMEOUT = 12
+JOIN_TIMEOUT = 3          # tyle czekamy na snapshot, zanim uznamy, że sieci nie ma
+JOIN_RETRY = 0.5
+SNAPSHOT_CHUNK = 1200     # max długość listy przedziałów w jednym datagramie
+DEFAULT_STRATEGY = "bruteforce:4:7"
 
 
 # === POMOCNICZE ===
@@ -37,6 +46,34 @@ def get_local_ip():
         s.close()
 
 
+def _chunks(items, limit):
+    """Skleja elementy przecinkami w kawałki nie dłuższe niż limit znaków."""
+    chunk = []
+    size = 0
+    for item in items:
+        if chunk and size + len(item) + 1 > limit:
+            yield ",".join(chunk)
+            chunk, size = [], 0
+        chunk.append(item)
+        size += len(item) + 1
+    if chunk:
+        yield ",".join(chunk)
+
+
+def _format_eta(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s"
+
+
 def valid_password(pwd: str):
     if not (4 <= len(pwd) <= 7):
         return False, "Hasło musi mieć długość między 4 a 7 znaków."
@@ -46,21 +83,42 @@ def valid_password(pwd: str):
 
 
 class DistributedBruteForcer:
-    def __init__(self, provided_password=None):
+    def __init__(self, provided_password=None, hash_spec=None, seeds=(), strategy_spec=DEFAULT_STRATEGY):
         self.ip = get_local_ip()
         self.peers = {}
-        self.done_batches = set()
-        self.assigned_batches = {}
+        self.done_batches = BatchMerkleTree()   # zbiór + drzewo Merkle do anti-entropy
+        # dzierżawy: paczka -> (właściciel, ostatni zgłoszony indeks kandydata, termin wygaśnięcia)
+        self.leases = {}
+        self._last_renew = 0.0
         self.global_stop = False
         self.lock = threading.Lock()
         self.sync_ready = threading.Event()
 
         self.target_hash = None
         self.hash_ready = threading.Event()
+        # snapshot z sieci, którego nie umiemy przyjąć (np. brak słownika) — nie dołączamy i nie tworzymy własnej sieci
+        self.join_rejected = threading.Event()
+        self._last_join = 0.0
+
+        # backend hasha (sha1, md5, pbkdf2, ...) i paczka przeskalowana jego kosztem
+        try:
+            self.hasher = hasher_from_spec(hash_spec)
+        except (ValueError, TypeError) as e:
+            print(f"[BŁĄD] Backend hasha: {e}")
+            sys.exit(1)
+        self.batch_size = self.hasher.batch_size(TASK_BATCH_SIZE)
 
         # --- NOWE ZMIENNE ---
         self.current_batch = None      # Numer paczki, którą teraz liczę
-        self.abort_flag = False        # Sygnał: "Przestań liczyć!"
+        self.cancel_token = CancellationToken()   # Sygnał: "Przestań liczyć!"
+        # postęp: lokalne tempo (z callbacku iteratora) i ETA całej sieci
+        self.hashed = 0
+        self._hashed_base = 0
+        self._batch_start = 0
+        self.local_rate = RateEstimator(0)
+        self.cluster_rate = None
+        self.wasted = 0                # kandydaci policzeni na darmo (konflikty, zdublowane paczki)
+        self._synced = {}              # ip -> paczki dopisane z LEAF/SNAP_DONE od ostatniego logu
         # --------------------
 
 
@@ -72,47 +130,54 @@ class DistributedBruteForcer:
                 print(f"[BŁĄD] {msg}")
                 sys.exit(1)
             self.proposed_password = provided_password
-            self.proposed_hash = hashlib.sha1(provided_password.encode()).hexdigest()
+            self.proposed_hash = self.hasher.hexdigest(provided_password)
 
-        print(f"[START] Node {self.ip}")
+        print(f"[START] Node {self.ip} ({self.hasher.spec}, paczka {self.batch_size})")
 
         # === SIEĆ ===
-        self.mcast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        self.mcast_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # gossip: częściowy widok peerów, rozsyłanie epidemiczne, multicast tylko do odkrywania
         try:
-            self.mcast_sock.bind(("", MULTICAST_PORT))
+            self.gossip = GossipNode(
+                self.ip, TASK_PORT, self._on_message,
+                seeds=[parse_peer(s, TASK_PORT) for s in seeds],
+                discovery=(MULTICAST_GROUP, MULTICAST_PORT),
+                heartbeat_meta=self._heartbeat_meta,
+                on_heartbeat=self._on_heartbeat,
+                namespace=GOSSIP_NAMESPACE,
+            )
         except Exception as e:
-            print(f"[FATAL] Bind multicast: {e}")
+            print(f"[FATAL] Bind: {e}")
             sys.exit(1)
-        mreq = socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton("0.0.0.0")
-        self.mcast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
 
-        self.task_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # === BIBLIOTEKA ===
+        # np. "file:Pwdb_top-10000000.txt:2:100" dla słownika
         try:
-            self.task_sock.bind(("", TASK_PORT))
-        except Exception as e:
-            print(f"[FATAL] Bind task: {e}")
+            self._set_strategy(strategy_spec)
+        except (ValueError, OSError) as e:
+            print(f"[BŁĄD] Generator: {e}")
             sys.exit(1)
 
-        # === BIBLIOTEKA ===
-        self.generator = GeneratorFactory.default_bruteforce(min_len=4, max_len=7)
-        # self.generator = GeneratorFactory.file_dictionary(file_path="Pwdb_top-10000000.txt", min_len=2, max_len=100)
-        self.strategy = self.generator.strategy
-
         # === WĄTKI ===
-        threading.Thread(target=self._multicast_listener, daemon=True).start()
-        threading.Thread(target=self._task_listener, daemon=True).start()
-        threading.Thread(target=self._send_ping, daemon=True).start()
-        threading.Thread(target=self._send_sync_periodic, daemon=True).start()
+        self.gossip.start()
         threading.Thread(target=self._cleanup, daemon=True).start()
         threading.Thread(target=self._work_loop, daemon=True).start()
 
         self._wait_for_network()
 
+    def _set_strategy(self, spec):
+        self.generator = GeneratorFactory.from_spec(spec)
+        self.strategy = self.generator.strategy
+        self.strategy_spec = spec
+
     def _wait_for_network(self):
-        print(f"[SYNC] Czekam na hash (max {SYNC_WAIT_TIMEOUT}s)...")
-        self._send_sync_request()
-        got = self.hash_ready.wait(SYNC_WAIT_TIMEOUT)
+        # JOIN do pierwszego odkrytego peera -> snapshot stanu w jednym RTT
+        print(f"[SYNC] Dołączam do sieci (max {JOIN_TIMEOUT}s)...")
+        deadline = time.time() + JOIN_TIMEOUT
+        got = False
+        while not got and time.time() < deadline and not self.join_rejected.is_set():
+            self._send_join()
+            got = self.hash_ready.wait(JOIN_RETRY)
+        self._exit_if_rejected()
 
         if got:
             if self.proposed_password:
@@ -126,6 +191,7 @@ class DistributedBruteForcer:
             peers = len(self.peers)
 
         if self.proposed_password:
+            self._exit_if_rejected()
             self.target_hash = self.proposed_hash
             self.hash_ready.set()
             print("[SYNC] Tworzę sieć z podanym hasłem.")
@@ -139,20 +205,30 @@ class DistributedBruteForcer:
         else:
             print(f"[SYNC] Czekam jeszcze {SYNC_WAIT_TIMEOUT}s...")
             got = self.hash_ready.wait(SYNC_WAIT_TIMEOUT)
+            self._exit_if_rejected()
             if got:
                 self.sync_ready.set()
                 self._log_status()
                 return
             pwd = self._ask_password()
 
+        # snapshot mógł zostać odrzucony, gdy czekaliśmy na hasło
+        self._exit_if_rejected()
         self.proposed_password = pwd
-        self.proposed_hash = hashlib.sha1(pwd.encode()).hexdigest()
+        self.proposed_hash = self.hasher.hexdigest(pwd)
         self.target_hash = self.proposed_hash
         self.hash_ready.set()
         self._broadcast_hash_set(self.target_hash)
         self.sync_ready.set()
         self._log_status()
 
+    def _exit_if_rejected(self):
+        if self.join_rejected.is_set():
+            print("[FATAL] Sieć działa z ustawieniami, których ten node nie obsługuje — kończę.")
+            self.global_stop = True
+            self.gossip.stop()
+            sys.exit(1)
+
     def _ask_password(self):
         print("[SYNC] Podaj hasło do ustawienia (4-7 znaków, a-zA-Z0-9):")
         while True:
@@ -167,149 +243,293 @@ class DistributedBruteForcer:
                 return pwd
             print(f"[BŁĄD] {msg}")
 
-    def _multicast_listener(self):
-        while not self.global_stop:
+    def _apply_hash_set(self, payload, ip):
+        # format: "<spec>|<hash>"; stare nody wysyłają sam hash (sha1)
+        spec, _, h = payload.rpartition("|")
+        spec = spec or "sha1"
+        if spec != self.hasher.spec:
             try:
-                data, addr = self.mcast_sock.recvfrom(4096)
-                msg, ip = data.decode(), addr[0]
-                if ip == self.ip: continue
+                hasher = hasher_from_spec(spec)
+            except (ValueError, TypeError) as e:
+                print(f"[HASH] Odrzucam backend {spec} od {ip}: {e}")
+                return False
+            self.hasher = hasher
+            self.batch_size = hasher.batch_size(TASK_BATCH_SIZE)
+            print(f"[HASH] Backend {spec} (paczka {self.batch_size})")
+        if self.target_hash != h:
+            print(f"[HASH] Nowy hash od {ip}")
+            if self.current_batch is not None:
+                self.cancel_token.cancel()
+        self.target_hash = h
+        self.hash_ready.set()
+        return True
 
-                with self.lock:
-                    self.peers[ip] = time.time()
-                    if ip not in self.peers:
-                        print(f"[DISCOVER] {ip}")
-
-                if msg.startswith("PING:"):
-                    pass
-                elif msg.startswith("SYNC:"):
-                    done = {int(x) for x in msg.split(":", 1)[1].split(",") if x}
-                    with self.lock:
-                        old = len(self.done_batches)
-                        self.done_batches |= done
-                    if len(self.done_batches) > old:
-                        print(f"[SYNC] +{len(done)} paczek od {ip}")
-                        self._log_status()
-                    self.sync_ready.set()
-                elif msg.startswith("HASH_SET:"):
-                    h = msg.split(":", 1)[1].strip()
-                    if self.target_hash != h:
-                        print(f"[HASH] Nowy hash od {ip}")
-                    self.target_hash = h
-                    self.hash_ready.set()
-                    self.sync_ready.set()
-            except:
-                continue
+    def _heartbeat_meta(self):
+        # heartbeat niesie tylko skróty: korzeń drzewa zrobionych paczek i znacznik hasha
+        with self.lock:
+            root = self.done_batches.root()
+        tag = self.target_hash[:16] if self.target_hash else "-"
+        return f"{root}:{tag}"
 
-    def _send_ping(self):
-        msg = f"PING:{self.ip}".encode()
-        while not self.global_stop:
+    def _on_heartbeat(self, ip, meta):
+        with self.lock:
+            if ip not in self.peers:
+                print(f"[DISCOVER] {ip}")
+            self.peers[ip] = time.time()
+        parts = meta.split(":")
+        if len(parts) < 2:
+            return
+        root, tag = parts[0], parts[1]
+        with self.lock:
+            differs = root != self.done_batches.root()
+        if differs:
+            self._start_reconcile(ip)
+        if (tag != "-" and not self.target_hash and not self.join_rejected.is_set()
+                and time.time() - self._last_join > JOIN_RETRY):
+            self._send_join(ip)
+
+    # === DOŁĄCZANIE ===
+    def _send_join(self, ip=None):
+        if ip is None:
+            peers = self.gossip.peers()
+            if not peers:
+                return
+            ip = random.choice(peers)[0]
+        self._last_join = time.time()
+        self._send_to(ip, "JOIN:")
+
+    def _send_snapshot(self, ip):
+        # nagłówek (hash + generator), potem zrobione paczki jako przedziały, na końcu przydziały
+        if not self.target_hash:
+            return
+        with self.lock:
+            ranges = format_ranges(self.done_batches)
+            work = [f"{b}={owner}@{pos}" for b, (owner, pos, _) in self.leases.items()]
+        self._send_to(ip, f"SNAP:{self.hasher.spec}|{self.target_hash}|{self.strategy_spec}")
+        for chunk in _chunks(ranges, SNAPSHOT_CHUNK):
+            self._send_to(ip, f"SNAP_DONE:{chunk}")
+        for chunk in _chunks(work, SNAPSHOT_CHUNK):
+            self._send_to(ip, f"SNAP_WORK:{chunk}")
+        print(f"[JOIN] Wysłano snapshot do {ip}")
+
+    def _apply_snapshot(self, payload, ip):
+        hash_spec, h, strategy_spec = payload.split("|", 2)
+        if strategy_spec != self.strategy_spec:
             try:
-                self.mcast_sock.sendto(msg, (MULTICAST_GROUP, MULTICAST_PORT))
-            except:
-                pass
-            time.sleep(PING_INTERVAL)
+                self._set_strategy(strategy_spec)
+            except (ValueError, OSError) as e:
+                print(f"[JOIN] Odrzucam generator {strategy_spec} od {ip}: {e}")
+                self.join_rejected.set()
+                return
+            print(f"[JOIN] Generator {strategy_spec}")
+        if not self._apply_hash_set(f"{hash_spec}|{h}", ip):
+            self.join_rejected.set()
+            return
+        self.sync_ready.set()
 
-    def _send_sync_periodic(self):
-        while not self.global_stop:
-            time.sleep(SYNC_INTERVAL)
-            self._broadcast_sync()
-            if self.target_hash:
-                self._broadcast_hash_set(self.target_hash)
+    # === ANTI-ENTROPY ===
+    def _start_reconcile(self, ip):
+        with self.lock:
+            children = self.done_batches.children(0, 0)
+        self._send_to(ip, f"TREE:0:0:{','.join(children)}")
+
+    def _on_tree(self, payload, ip):
+        # odpowiadamy tylko dla poddrzew, które się różnią
+        level, idx, hashes = payload.split(":", 2)
+        level, idx = int(level), int(idx)
+        replies = []
+        with self.lock:
+            tree = self.done_batches
+            for child in tree.diff_children(level, idx, hashes.split(",")):
+                if tree.is_leaf_level(level + 1):
+                    csv = ",".join(map(str, sorted(tree.leaf_items(child))))
+                    replies.append(f"LEAF:{child}:{csv}")
+                else:
+                    replies.append(f"TREE:{level + 1}:{child}:{','.join(tree.children(level + 1, child))}")
+        for r in replies:
+            self._send_to(ip, r)
+
+    def _on_leaf(self, payload, ip):
+        leaf, csv = payload.split(":", 1)
+        leaf = int(leaf)
+        theirs = {int(x) for x in csv.split(",") if x}
+        with self.lock:
+            added = self.done_batches.update(theirs)
+            mine = self.done_batches.leaf_items(leaf)
+        # mamy coś, czego nadawca nie ma -> odsyłamy swój liść
+        if mine - theirs:
+            self._send_to(ip, f"LEAF:{leaf}:{','.join(map(str, sorted(mine)))}")
+        if added:
+            self._note_synced(ip, added)
+        self.sync_ready.set()
 
-    def _broadcast_sync(self):
+    def _note_synced(self, ip, added):
+        # jeden reconcile to setki LEAF-ów — logujemy zbiorczo z _cleanup, a nie przy każdym
         with self.lock:
-            csv = ",".join(map(str, sorted(self.done_batches)))
-        msg = f"SYNC:{csv}".encode()
-        try:
-            self.mcast_sock.sendto(msg, (MULTICAST_GROUP, MULTICAST_PORT))
-        except:
-            pass
+            self._synced[ip] = self._synced.get(ip, 0) + added
+
+    def _log_synced(self):
+        with self.lock:
+            synced, self._synced = self._synced, {}
+        for ip, added in synced.items():
+            print(f"[SYNC] +{added} paczek od {ip}")
+        return bool(synced)
 
     def _broadcast_hash_set(self, h):
-        msg = f"HASH_SET:{h}".encode()
+        self._send_to_all(f"HASH_SET:{self.hasher.spec}|{h}")
+        print("[HASH] Rozgłoszono hash.")
+
+    def _on_message(self, msg, ip):
+        # wszystkie wiadomości (epidemiczne i bezpośrednie) przychodzą tutaj z gossipa
+        if self.global_stop or ip == self.ip:
+            return
         try:
-            self.mcast_sock.sendto(msg, (MULTICAST_GROUP, MULTICAST_PORT))
-            print("[HASH] Rozgłoszono hash.")
+            with self.lock:
+                self.peers[ip] = time.time()
+
+            if msg.startswith("TASK_START:"):
+                b, _, offset = msg.split(":", 1)[1].partition(":")
+                b = int(b)
+                offset = int(offset) if offset else b * self.batch_size
+
+                # SPRAWDZAMY CZY WYSTEPUJE KONFLIKT
+                if self.current_batch is not None and self.current_batch == b:
+                    # moja dzierżawa wygasła (utknąłem) -> paczkę przejmuje nadawca
+                    if time.time() - self._last_renew > LEASE_TTL:
+                        print(f"[KONFLIKT] {ip} przejął paczkę {b} po wygaśnięciu dzierżawy. Odpuszczam.")
+                        self.cancel_token.cancel()
+                    # JEST KONFLIKT -> SPRAWDZAMY KTO MA NIZSZE IP
+                    elif ip < self.ip:
+                        print(f"[KONFLIKT] {ip} zabiera paczkę {b} (ma niższe IP). Odpuszczam.")
+                        self.cancel_token.cancel()
+                    else:
+                        print(f"[KONFLIKT] {ip} próbował wziąć {b}, ale ja mam niższe IP. Ignoruję go.")
+
+                with self.lock:
+                    # node liczy jedną paczkę naraz — jego poprzednie dzierżawy są nieaktualne
+                    for old in [k for k, v in self.leases.items() if v[0] == ip]:
+                        del self.leases[old]
+                    self.leases[b] = (ip, offset, time.time() + LEASE_TTL)
+                print(f"[INFO] {ip} → {b}" + (f" od {offset}" if offset != b * self.batch_size else ""))
+                self._log_status()
+            elif msg.startswith("TASK_DONE:"):
+                b = int(msg.split(":", 1)[1])
+                with self.lock:
+                    if not self.done_batches.add(b):
+                        self.wasted += self.batch_size   # ktoś policzył zrobioną już paczkę
+                    self.leases.pop(b, None)
+                if self.current_batch == b:
+                    # ktoś już skończył moją paczkę — dalsze liczenie to strata
+                    self.cancel_token.cancel()
+                print(f"[DONE] {ip} zakończył {b}")
+                self._log_status()
+            elif msg.startswith("FOUND:"):
+                pwd = msg.split(":", 1)[1]
+                if not self._verify_found(pwd):
+                    print(f"[FOUND] Odrzucono fałszywe zgłoszenie {pwd!r} od {ip}")
+                    return
+                print(f"\n[FOUND] Hasło: {pwd} (przez {ip}, indeks {self._found_index(pwd)})")
+                self.global_stop = True
+                self.cancel_token.cancel()
+            elif msg.startswith("JOIN:"):
+                self._send_snapshot(ip)
+            elif msg.startswith("SNAP:"):
+                self._apply_snapshot(msg.split(":", 1)[1], ip)
+            elif msg.startswith("SNAP_DONE:"):
+                with self.lock:
+                    added = self.done_batches.update(parse_ranges(msg.split(":", 1)[1]))
+                if added:
+                    self._note_synced(ip, added)
+            elif msg.startswith("LEASE:"):
+                b, pos = map(int, msg.split(":", 1)[1].split(":"))
+                with self.lock:
+                    lease = self.leases.get(b)
+                    if b not in self.done_batches and (lease is None or lease[0] == ip):
+                        self.leases[b] = (ip, pos, time.time() + LEASE_TTL)
+            elif msg.startswith("SNAP_WORK:"):
+                now = time.time()
+                with self.lock:
+                    for entry in msg.split(":", 1)[1].split(","):
+                        b, _, rest = entry.partition("=")
+                        owner, _, pos = rest.partition("@")
+                        if owner != self.ip:
+                            self.leases[int(b)] = (owner, int(pos), now + LEASE_TTL)
+            elif msg.startswith("TREE:"):
+                self._on_tree(msg.split(":", 1)[1], ip)
+            elif msg.startswith("LEAF:"):
+                self._on_leaf(msg.split(":", 1)[1], ip)
+            elif msg.startswith("HASH_SET:"):
+                self._apply_hash_set(msg.split(":", 1)[1].strip(), ip)
+                self.sync_ready.set()
         except:
             pass
 
-    def _send_sync_request(self):
-        msg = b"SYNC_REQ:"
-        for ip in list(self.peers):
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.sendto(msg, (ip, TASK_PORT))
-                s.close()
-            except:
-                pass
+    def _verify_found(self, pwd):
+        """Zgłoszenie FOUND musi dawać nasz hash i (jeśli strategia ma dostęp swobodny) leżeć w przestrzeni."""
+        if not self.target_hash or self.hasher.hexdigest(pwd) != self.target_hash:
+            return False
+        if hasattr(self.generator.core, "index_of"):
+            return pwd in self.generator
+        return True
 
-    def _task_listener(self):
-        while not self.global_stop:
-            try:
-                data, addr = self.task_sock.recvfrom(4096)
-                msg, ip = data.decode(), addr[0]
-                if ip == self.ip: continue
+    def _found_index(self, pwd):
+        if not hasattr(self.generator.core, "index_of"):
+            return "?"
+        return self.generator.index(pwd)
 
-                with self.lock:
-                    self.peers[ip] = time.time()
-
-                if msg.startswith("TASK_START:"):
-                    b = int(msg.split(":", 1)[1])
-
-                    # SPRAWDZAMY CZY WYSTEPUJE KONFLIKT
-                    if self.current_batch is not None and self.current_batch == b:
-                        # JEST KONFLIKT -> SPRAWDZAMY KTO MA NIZSZE IP
-                        if ip < self.ip:
-                            print(f"[KONFLIKT] {ip} zabiera paczkę {b} (ma niższe IP). Odpuszczam.")
-                            self.abort_flag = True
-                        else:
-                            print(f"[KONFLIKT] {ip} próbował wziąć {b}, ale ja mam niższe IP. Ignoruję go.")
-
-                    with self.lock:
-                        self.assigned_batches[ip] = (b, time.time())
-                    print(f"[INFO] {ip} → {b}")
-                    self._log_status()
-                elif msg.startswith("TASK_DONE:"):
-                    b = int(msg.split(":", 1)[1])
-                    with self.lock:
-                        self.done_batches.add(b)
-                        self.assigned_batches.pop(ip, None)
-                    print(f"[DONE] {ip} zakończył {b}")
-                    self._broadcast_sync()
-                    self._log_status()
-                elif msg.startswith("FOUND:"):
-                    pwd = msg.split(":", 1)[1]
-                    print(f"\n[FOUND] Hasło: {pwd} (przez {ip})")
-                    self.global_stop = True
-                elif msg.startswith("SYNC_REQ:"):
-                    self._broadcast_sync()
-            except:
-                continue
+    def shutdown(self):
+        """Przed wyjściem: czekamy na potwierdzenia (FOUND, TASK_DONE, ...) — także tych przekazywanych dalej."""
+        if not self.gossip.flush():
+            print("[STOP] Nie wszystkie wiadomości zostały potwierdzone")
+        self.gossip.stop()
+
+    def _send_to(self, ip, msg):
+        self.gossip.send(ip, msg)
 
     def _send_to_all(self, msg):
-        for ip in list(self.peers):
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.settimeout(0.5)
-                s.sendto(msg.encode(), (ip, TASK_PORT))
-                s.close()
-            except:
-                pass
+        # wszystko, co rozsyłamy do całej sieci (TASK_*, FOUND, HASH_SET), idzie z potwierdzeniami
+        self.gossip.broadcast(msg, reliable=True)
 
     def _next_batch(self):
+        # najniższa paczka, która nie jest zrobiona ani aktywnie dzierżawiona;
+        # wygasłą dzierżawę przejmujemy od ostatniego zgłoszonego offsetu
+        now = time.time()
         with self.lock:
             b = 0
-            while b in self.done_batches or any(v[0] == b for v in self.assigned_batches.values()):
+            while True:
+                if b in self.done_batches:
+                    b += 1
+                    continue
+                lease = self.leases.get(b)
+                if lease is None:
+                    offset = b * self.batch_size
+                    break
+                owner, pos, expires = lease
+                if expires < now:
+                    offset = pos
+                    print(f"[LEASE] Przejmuję paczkę {b} od {owner} (offset {pos - b * self.batch_size})")
+                    break
                 b += 1
-            self.assigned_batches[self.ip] = (b, time.time())
-            return b
+            self.leases[b] = (self.ip, offset, now + LEASE_TTL)
+            self._last_renew = now
+            return b, offset
 
     def _work_loop(self):
+        # uszkodzony słownik (np. ucięty .xz) wychodzi dopiero przy czytaniu — kończymy z komunikatem,
+        # zamiast zostawić noda z martwym wątkiem roboczym
+        try:
+            self._work()
+        except ValueError as e:
+            print(f"[FATAL] Generator: {e}")
+            self.global_stop = True
+
+    def _work(self):
         print("[WORK] Czekam na hash...")
         while not self.global_stop and not self.hash_ready.is_set():
             time.sleep(0.5)
         if self.global_stop: return
         print("[WORK] Start!")
+        self.cluster_rate = RateEstimator(self.strategy.total_combinations(), window=60)
 
         while not self.global_stop:
             if not self.target_hash:
@@ -318,17 +538,16 @@ class DistributedBruteForcer:
                     time.sleep(0.5)
                 continue
 
-            batch = self._next_batch()
+            batch, offset = self._next_batch()
             
             # zapisujemy aktualna paczke
             self.current_batch = batch
-            self.abort_flag = False
+            self.cancel_token = CancellationToken()
 
             print(f"[TASK] Paczka {batch}")
-            self._send_to_all(f"TASK_START:{batch}")
+            self._send_to_all(f"TASK_START:{batch}:{offset}")
 
-            start_idx = batch * TASK_BATCH_SIZE
-            found = self._process_batch(start_idx)
+            found = self._process_batch(offset, (batch + 1) * self.batch_size)
 
             # po zakończeniu pracy czyścimy aktualną paczkę
             self.current_batch = None
@@ -336,69 +555,112 @@ class DistributedBruteForcer:
             # sprawdzamy cze przerwano przez konflikt (dwa komputery wziely tą samą paczke)
             if found == "ABORTED":
                 with self.lock:
-                    self.assigned_batches.pop(self.ip, None)
+                    if self.leases.get(batch, (None,))[0] == self.ip:
+                        del self.leases[batch]
+                    self.wasted += self.hashed - self._hashed_base
                 # Wracamy na początek pętli po nową paczkę
                 continue
 
             if found:
-                self.global_stop = True
+                # najpierw wysyłka (trafia do _pending), dopiero potem sygnał końca dla wątku głównego
                 self._send_to_all(f"FOUND:{found}")
                 print(f"[FOUND] Znalazłem: {found}")
+                self.global_stop = True
                 break
             else:
                 with self.lock:
                     self.done_batches.add(batch)
-                    self.assigned_batches.pop(self.ip, None)
+                    self.leases.pop(batch, None)
                 self._send_to_all(f"TASK_DONE:{batch}")
-                self._broadcast_sync()
                 self._log_status()
 
-    def _process_batch(self, start_idx):
-        batch_gen = self.strategy.generate(start_idx, TASK_BATCH_SIZE)
+    def _process_batch(self, start_idx, end_idx):
+        # stop/konflikt sprawdza iterator co check_every kandydatów, nie pętla przy każdym haśle;
+        # dla wolnych KDF sprawdzamy częściej, żeby zdążyć odnowić dzierżawę
+        self._hashed_base = self.hashed
+        self._batch_start = start_idx
+        check_every = max(1, int(CHECK_EVERY / self.hasher.cost))
+        batch_gen = self.strategy.generate(start_idx, end_idx - start_idx,
+                                           progress=self._on_progress, cancel=self.cancel_token,
+                                           check_every=check_every)
+        hexdigest = self.hasher.hexdigest
+        target = self.target_hash
         for pwd in batch_gen:
-            if self.global_stop:
-                return None
-            if self.abort_flag:
-                return "ABORTED"
-            if hashlib.sha1(pwd.encode()).hexdigest() == self.target_hash:
+            if hexdigest(pwd) == target:
                 return pwd
+        if self.cancel_token.cancelled and not self.global_stop:
+            return "ABORTED"
         return None
 
+    def _on_progress(self, pos):
+        self.hashed = self._hashed_base + pos - self._batch_start
+        self.local_rate.update(self.hashed)
+        # odnowienie dzierżawy z aktualnym offsetem — tylko gdy faktycznie liczymy
+        now = time.time()
+        batch = self.current_batch
+        if batch is not None and now - self._last_renew >= LEASE_RENEW and not self.cancel_token.cancelled:
+            self._last_renew = now
+            with self.lock:
+                self.leases[batch] = (self.ip, pos, now + LEASE_TTL)
+            self.gossip.broadcast(f"LEASE:{batch}:{pos}")
+
     def _cleanup(self):
         while not self.global_stop:
             time.sleep(5)
             now = time.time()
             with self.lock:
                 dead = [ip for ip, t in self.peers.items() if now - t > TASK_TIMEOUT]
+                # dzierżawy nie zależą od żywotności peera — wygasają same, gdy nie są odnawiane
                 for ip in dead:
                     del self.peers[ip]
-                    self.assigned_batches.pop(ip, None)
                     print(f"[OFFLINE] {ip}")
-            if dead:
+            if self._log_synced() or dead:
                 self._log_status()
 
     def _log_status(self):
         with self.lock:
-            done = ", ".join(map(str, sorted(self.done_batches))) or "brak"
-            working = [f"{b} ({'ja' if ip==self.ip else ip})" for ip, (b,_) in self.assigned_batches.items()]
+            done = ", ".join(format_ranges(self.done_batches)) or "brak"
+            now = time.time()
+            working = [
+                f"{b} {100 * (pos - b * self.batch_size) // self.batch_size}%"
+                f"{'' if exp > now else ' wygasła'} ({'ja' if ip==self.ip else ip})"
+                for b, (ip, pos, exp) in sorted(self.leases.items())
+            ]
             work_str = ", ".join(working) or "brak"
             peers_str = ", ".join(sorted(p for p in self.peers if p != self.ip)) or "brak"
             th = self.target_hash or "brak"
+            done_count = len(self.done_batches)
+            wasted = self.wasted
+        st = self.gossip.stats
         print(f"[STATUS] zrobione: {done}")
         print(f"[STATUS] robione: {work_str}")
         print(f"[STATUS] nody: {peers_str}")
         print(f"[STATUS] hash: {th}")
+        print(f"[STATUS] sieć: wysłane {st['sent']}, retransmisje {st['retransmits']}, "
+              f"utracone {st['gave_up']}, duplikaty {st['duplicates']}, zmarnowane {wasted} kandydatów")
+        if self.cluster_rate is not None:
+            self.cluster_rate.update(min(done_count * self.batch_size, self.cluster_rate.total))
+            print(f"[STATUS] tempo: {self.local_rate.rate():,.0f}/s (ja), "
+                  f"{self.cluster_rate.rate():,.0f}/s (sieć), "
+                  f"{self.cluster_rate.fraction():.4%}, ETA: {_format_eta(self.cluster_rate.eta())}")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--password", "-p", help="Hasło do ustawienia")
+    parser.add_argument("--seed", action="append", default=[],
+                        help="Adres peera ip[:port] do startu bez multicastu (można podać wiele razy)")
+    parser.add_argument("--strategy", default=DEFAULT_STRATEGY,
+                        help="Generator, np. bruteforce:4:7, custom:abc123:4:7, file:slownik.txt:2:100")
+    parser.add_argument("--hash", default="sha1",
+                        help="Backend hasha, np. sha1, md5, ntlm, salted,algo=sha256,salt=<hex>,mode=prefix, pbkdf2,algo=sha256,salt=<hex>,iter=10000")
     args = parser.parse_args()
 
-    node = DistributedBruteForcer(args.password)
+    node = DistributedBruteForcer(args.password, args.hash, args.seed, args.strategy)
     try:
         while not node.global_stop:
             time.sleep(1)
     except KeyboardInterrupt:
         print("\n[STOP]")
         node.global_stop = True
+    node.shutdown()
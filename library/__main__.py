@@ -0,0 +1,170 @@
+"""
+Strumień kandydatów na stdout — do karmienia zewnętrznych crackerów, np.:
+
+    python -m library bruteforce:4:5 | hashcat -m 100 hash.txt
+    python -m library --charset abc123 --min-len 4 --max-len 6 --shard 2/8
+    python -m library --wordlist slownik.txt.gz --start 1000000 --count 5000000
+
+Hasła idą jako linie rozdzielone "\\n", zapisywane dużymi paczkami prosto do
+sys.stdout.buffer. Tempo i ETA lecą na stderr, żeby nie mieszać się z danymi.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+from .builder import GeneratorBuilder
+from .factory import GeneratorFactory
+from .generator import PasswordGenerator
+from .progress import RateEstimator
+
+
+CHUNK_SIZE = 65536      # tylu kandydatów łączymy w jeden write()
+REPORT_EVERY = 2.0      # co ile sekund raport na stderr
+BRUTEFORCE_LENGTHS = (4, 7)   # domyślne --min-len/--max-len dla bruteforce; słownik domyślnie bez filtra
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'i/N' -> (i, N), i liczone od 0."""
+    try:
+        i, n = (int(x) for x in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Niepoprawny shard: {text} (oczekiwano i/N)")
+    if n < 1 or not 0 <= i < n:
+        raise argparse.ArgumentTypeError(f"Shard {text} poza zakresem (0 <= i < N)")
+    return i, n
+
+
+def build_generator(args: argparse.Namespace) -> PasswordGenerator:
+    if args.spec:
+        return GeneratorFactory.from_spec(args.spec)
+    if args.wordlist:
+        # file_dictionary zgłasza OSError dla brakującego/nieczytelnego pliku
+        min_len = 1 if args.min_len is None else args.min_len
+        max_len = sys.maxsize if args.max_len is None else args.max_len
+        return GeneratorFactory.file_dictionary(args.wordlist, min_len, max_len)
+    min_len, max_len = BRUTEFORCE_LENGTHS
+    builder = GeneratorBuilder().with_length_range(
+        min_len if args.min_len is None else args.min_len,
+        max_len if args.max_len is None else args.max_len,
+    )
+    if args.charset:
+        builder.with_alphabet(args.charset)
+    else:
+        builder.with_default_alphabet()
+    return builder.build()
+
+
+def needs_total(args: argparse.Namespace) -> bool:
+    """Rozmiar przestrzeni jest potrzebny tylko bez --count albo przy --shard (dla słownika to pełny odczyt pliku)."""
+    return args.count is None or args.shard is not None
+
+
+def candidate_range(total: Optional[int], start: int, count: Optional[int],
+                    shard: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    Zakres [lo, hi) do wypisania; shard dzieli go na N ciągłych kawałków.
+    total=None (nieznany) -> hi = start + count, strumień i tak skończy się na końcu przestrzeni.
+    """
+    lo = max(0, start)
+    if total is None:
+        hi = lo + max(0, count)
+    else:
+        lo = min(lo, total)
+        hi = total if count is None else min(total, lo + max(0, count))
+    if shard:
+        i, n = shard
+        size = hi - lo
+        lo, hi = lo + size * i // n, lo + size * (i + 1) // n
+    return lo, hi
+
+
+def _format_rate(rate: float) -> str:
+    for unit in ("", "k", "M", "G"):
+        if rate < 1000:
+            return f"{rate:.1f}{unit}"
+        rate /= 1000
+    return f"{rate:.1f}T"
+
+
+def _report(est: RateEstimator, elapsed: float):
+    eta = est.eta()
+    eta_text = f"{eta:.0f}s" if eta is not None else "?"
+    print(f"[STREAM] {est.done}/{est.total} ({est.fraction():.1%}), "
+          f"{_format_rate(est.rate())} h/s, śr. {_format_rate(est.done / elapsed if elapsed else 0)} h/s, "
+          f"ETA {eta_text}", file=sys.stderr, flush=True)
+
+
+def stream(generator: PasswordGenerator, lo: int, hi: int, out, chunk_size: int = CHUNK_SIZE,
+           report_every: Optional[float] = REPORT_EVERY) -> int:
+    """Wypisuje kandydatów [lo, hi) do binarnego strumienia `out`; zwraca ich liczbę."""
+    est = RateEstimator(hi - lo)
+    written = 0
+    t0 = last = time.monotonic()
+    write = out.write
+    for chunk in generator.chunks(chunk_size, lo, hi):
+        chunk.append("")
+        write("\n".join(chunk).encode("utf-8"))
+        written += len(chunk) - 1
+        if report_every is not None:
+            now = time.monotonic()
+            if now - last >= report_every:
+                est.update(written)
+                _report(est, now - t0)
+                last = now
+    out.flush()
+    if report_every is not None:
+        est.update(written)
+        _report(est, time.monotonic() - t0)
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m library",
+                                     description="Wypisuje kandydatów na stdout, po jednym w linii.")
+    parser.add_argument("spec", nargs="?",
+                        help="Opis generatora jak w GeneratorFactory.from_spec, np. bruteforce:4:7, "
+                             "custom:abc123:4:7, file:slownik.txt:2:100")
+    parser.add_argument("--charset", help="Własny alfabet (Builder); domyślnie litery i cyfry")
+    parser.add_argument("--wordlist", help="Słownik (także .gz/.bz2/.xz) zamiast bruteforce")
+    parser.add_argument("--min-len", type=int,
+                        help=f"Min. długość (bruteforce: domyślnie {BRUTEFORCE_LENGTHS[0]}, słownik: bez filtra)")
+    parser.add_argument("--max-len", type=int,
+                        help=f"Max. długość (bruteforce: domyślnie {BRUTEFORCE_LENGTHS[1]}, słownik: bez filtra)")
+    parser.add_argument("--start", type=int, default=0, help="Indeks pierwszego kandydata")
+    parser.add_argument("--count", type=int, help="Ile kandydatów (domyślnie do końca)")
+    parser.add_argument("--shard", type=parse_shard, help="Część i/N zakresu (i od 0)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Kandydatów na jeden write()")
+    parser.add_argument("--quiet", "-q", action="store_true", help="Bez raportów tempa na stderr")
+    args = parser.parse_args(argv)
+
+    if args.spec and (args.charset or args.wordlist):
+        parser.error("spec wyklucza --charset/--wordlist")
+    if args.chunk < 1:
+        parser.error("--chunk musi być dodatni")
+    try:
+        generator = build_generator(args)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    total = len(generator) if needs_total(args) else None
+    lo, hi = candidate_range(total, args.start, args.count, args.shard)
+    if not args.quiet:
+        of = f" z {total}" if total is not None else ""
+        print(f"[STREAM] Zakres [{lo}, {hi}){of}", file=sys.stderr, flush=True)
+    try:
+        stream(generator, lo, hi, sys.stdout.buffer, args.chunk, None if args.quiet else REPORT_EVERY)
+    except BrokenPipeError:
+        # odbiorca (np. head) zamknął potok — to normalny koniec, nie błąd
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
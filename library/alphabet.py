@@ -12,10 +12,20 @@ class Alphabet:
         if not self.charset:
             raise ValueError("Alfabet nie może być pusty")
         self.base = len(self.charset)
+        # odwrotność __getitem__: znak -> pierwsza pozycja w alfabecie
+        self._positions = {}
+        for i, ch in enumerate(self.charset):
+            self._positions.setdefault(ch, i)
 
     def __getitem__(self, index: int) -> str:
         return self.charset[index % self.base]
 
+    def index(self, char: str) -> int:
+        try:
+            return self._positions[char]
+        except KeyError:
+            raise ValueError(f"Znak {char!r} spoza alfabetu") from None
+
     def __len__(self) -> int:
         return self.base
 
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import bisect
+import bz2
+import gzip
+import itertools
+import lzma
+import zlib
+from typing import Callable, IO, Iterator, List
+
+
+# Rozszerzenie pliku -> funkcja otwierająca strumień tekstowy
+OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+}
+
+READ_SIZE = 64 * 1024
+CHECKPOINT_SPACING = 1_000_000   # co ile słów zapamiętujemy stan dekompresora
+
+# Błędy uszkodzonego / nie-tego-formatu pliku (BadGzipFile i "Invalid data stream" z bz2 to OSError,
+# ucięty strumień to EOFError). FileNotFoundError obsługują wywołujący osobno.
+CORRUPT_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError)
+
+
+def open_text(file_path: str) -> IO[str]:
+    """Otwiera słownik jako tekst — zwykły albo skompresowany (.gz/.bz2/.xz)."""
+    for suffix, opener in OPENERS.items():
+        if file_path.endswith(suffix):
+            return opener(file_path, "rt", encoding="utf-8", errors="ignore")
+    return open(file_path, "r", encoding="utf-8", errors="ignore")
+
+
+def corrupt_error(file_path: str, error: Exception) -> ValueError:
+    return ValueError(f"Uszkodzony słownik {file_path}: {error}")
+
+
+def probe(file_path: str):
+    """Czyta pierwszy blok pliku; ValueError, gdy to nie jest poprawny (skompresowany) tekst."""
+    try:
+        with open_text(file_path) as f:
+            f.read(READ_SIZE)
+    except FileNotFoundError:
+        raise
+    except CORRUPT_ERRORS as e:
+        raise corrupt_error(file_path, e) from None
+
+
+class _Checkpoint:
+    """Stan dekompresji tuż po przeczytaniu `offset` bajtów skompresowanego pliku."""
+
+    __slots__ = ("word_idx", "offset", "decomp", "tail")
+
+    def __init__(self, word_idx: int, offset: int, decomp, tail: bytes):
+        self.word_idx = word_idx   # ile słów (po filtrze) wypadło przed tym punktem
+        self.offset = offset       # pozycja w pliku .gz
+        self.decomp = decomp       # kopia zlib.Decompress
+        self.tail = tail           # niedokończona linia z poprzedniego kawałka
+
+
+class GzipCheckpointIndex:
+    """
+    Indeks punktów kontrolnych dla pliku .gz.
+    Co `spacing` słów zapisuje kopię stanu dekompresora (zlib.Decompress.copy()),
+    dzięki czemu words_from(start_idx) wznawia dekompresję z najbliższego
+    punktu przed start_idx, a nie od bajtu 0. Indeks rośnie leniwie —
+    przy każdym przejściu za ostatni znany punkt.
+    """
+
+    def __init__(self, file_path: str, accept: Callable[[str], bool], spacing: int = CHECKPOINT_SPACING):
+        self.file_path = file_path
+        self.accept = accept
+        self.spacing = spacing
+        self._checkpoints: List[_Checkpoint] = [
+            _Checkpoint(0, 0, zlib.decompressobj(zlib.MAX_WBITS | 16), b"")
+        ]
+        self._keys: List[int] = [0]
+        self._total = None
+
+    def __len__(self) -> int:
+        """Liczba słów w pliku (pierwsze wywołanie przechodzi resztę pliku i dopisuje punkty)."""
+        if self._total is None:
+            for _ in self._scan(self._checkpoints[-1]):
+                pass
+        return self._total
+
+    def words_from(self, start_idx: int) -> Iterator[str]:
+        pos = bisect.bisect_right(self._keys, start_idx) - 1
+        cp = self._checkpoints[pos]
+        return itertools.islice(self._scan(cp), start_idx - cp.word_idx, None)
+
+    def _scan(self, cp: _Checkpoint) -> Iterator[str]:
+        # zapisujemy nowe punkty tylko, gdy idziemy od ostatniego znanego
+        record = cp is self._checkpoints[-1]
+        d = cp.decomp.copy()
+        tail = cp.tail
+        idx = cp.word_idx
+        accept = self.accept
+
+        with open(self.file_path, "rb") as f:
+            f.seek(cp.offset)
+            while True:
+                chunk = f.read(READ_SIZE)
+                try:
+                    if chunk:
+                        data = d.decompress(chunk)
+                        # plik .gz może mieć kilka członów — każdy to osobny strumień
+                        while d.eof and d.unused_data.strip(b"\x00"):
+                            rest = d.unused_data
+                            d = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                            data += d.decompress(rest)
+                    else:
+                        data = d.flush()
+                        if not d.eof:
+                            raise EOFError("plik .gz urwany przed końcem strumienia")
+                except (zlib.error, EOFError) as e:
+                    raise corrupt_error(self.file_path, e) from None
+
+                lines = (tail + data).split(b"\n")
+                tail = lines.pop() if chunk else b""
+                for line in lines:
+                    for word in line.decode("utf-8", "ignore").split():
+                        if accept(word):
+                            yield word
+                            idx += 1
+
+                if not chunk:
+                    if record and self._total is None:
+                        self._total = idx
+                    return
+                if record and idx - self._keys[-1] >= self.spacing:
+                    self._checkpoints.append(_Checkpoint(idx, f.tell(), d.copy(), tail))
+                    self._keys.append(idx)
@@ -1,9 +1,17 @@
 from __future__ import annotations
+import os
 from .builder import GeneratorBuilder
 from .generator import PasswordGenerator
 from .alphabet import Alphabet
 
 
+def _check_readable(file_path: str):
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"Brak pliku słownika: {file_path}")
+    if not os.access(file_path, os.R_OK):
+        raise PermissionError(f"Brak prawa odczytu słownika: {file_path}")
+
+
 class GeneratorFactory:
     """Abstract Factory – tworzy gotowe generatory dla typowych scenariuszy."""
     
@@ -28,9 +36,38 @@ class GeneratorFactory:
     @staticmethod
     def file_dictionary(file_path: str, min_len: int = 4, max_len: int = 7) -> PasswordGenerator:
         from .strategies import FileDictionaryStrategy
+        # strategia połyka brak pliku (pusta przestrzeń) — tu to błąd, nie zero kandydatów
+        _check_readable(file_path)
         strategy = FileDictionaryStrategy(
             file_path=file_path,
             min_length=min_len,
             max_length=max_len
         )
-        return PasswordGenerator(strategy)
\ No newline at end of file
+        return PasswordGenerator(strategy)
+
+    @staticmethod
+    def from_spec(spec: str) -> PasswordGenerator:
+        """
+        Tworzy generator z tekstowego opisu (np. przesłanego przez sieć):
+          bruteforce:4:7
+          custom:abc123:4:7
+          file:/sciezka/slownik.txt:2:100
+        """
+        kind, _, rest = spec.partition(":")
+        try:
+            *arg, min_len, max_len = rest.rsplit(":", 2)
+            min_len, max_len = int(min_len), int(max_len)
+        except ValueError:
+            raise ValueError(f"Niepoprawny opis generatora: {spec}")
+
+        if kind == "bruteforce":
+            generator = GeneratorFactory.default_bruteforce(min_len, max_len)
+        elif kind == "custom" and arg:
+            generator = GeneratorFactory.custom_alphabet(arg[0], min_len, max_len)
+        elif kind == "file" and arg:
+            # spec może przyjść z sieci (SNAP) — brak słownika u nas to OSError z file_dictionary
+            generator = GeneratorFactory.file_dictionary(arg[0], min_len, max_len)
+        else:
+            raise ValueError(f"Nieznany typ generatora: {kind}")
+        generator.spec = spec
+        return generator
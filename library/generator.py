@@ -1,6 +1,11 @@
 from __future__ import annotations
-from typing import Iterator, Optional
+import itertools
+from typing import Iterator, List, Optional, Union
 from .alphabet import Alphabet
+from .progress import CHECK_EVERY, CancellationToken, ProgressCallback
+
+
+SUFFIX_TABLE = 1 << 16   # górny limit rozmiaru tablicy końcówek w passwords()
 
 
 class CoreBruteGenerator:
@@ -17,6 +22,7 @@ class CoreBruteGenerator:
         self._lengths = list(range(self.min_length, self.max_length + 1))
         self._counts = [alphabet.base ** L for L in self._lengths]
         self._total = sum(self._counts)
+        self._suffixes = {}
 
     def total_combinations(self, min_len: int = None, max_len: int = None) -> int:
         # parametry min_len/max_len są ignorowane — generator ma ustawiony swój zakres
@@ -35,35 +41,133 @@ class CoreBruteGenerator:
             offset -= cnt
         raise IndexError("Indeks poza zakresem generatora")
 
+    def _password_to_idx(self, pwd: str) -> int:
+        """Odwrotność _idx_to_password."""
+        offset = 0
+        for L, cnt in zip(self._lengths, self._counts):
+            if L == len(pwd):
+                x = 0
+                for ch in pwd:
+                    x = x * self.alphabet.base + self.alphabet.index(ch)
+                return offset + x
+            offset += cnt
+        raise ValueError(f"Hasło {pwd!r} ma długość spoza zakresu generatora")
+
+    # --- dostęp swobodny (używany przez PasswordGenerator jako sekwencję) ---
+    def password_at(self, idx: int) -> str:
+        if idx < 0:
+            raise IndexError("Indeks poza zakresem generatora")
+        return self._idx_to_password(idx)
+
+    def index_of(self, pwd: str) -> int:
+        return self._password_to_idx(pwd)
+
+    def _digits(self, x: int, length: int) -> str:
+        """Liczba x zapisana w alfabecie na `length` pozycjach (bez przesunięcia długości)."""
+        chars = []
+        for _ in range(length):
+            x, r = divmod(x, self.alphabet.base)
+            chars.append(self.alphabet[r])
+        return "".join(reversed(chars))
+
+    def _suffix_table(self, k: int) -> List[str]:
+        """Wszystkie napisy długości k w kolejności indeksów (cache)."""
+        table = self._suffixes.get(k)
+        if table is None:
+            table = ["".join(t) for t in itertools.product(self.alphabet.charset, repeat=k)]
+            self._suffixes[k] = table
+        return table
+
+    def passwords(self, start_idx: int, count: int) -> List[str]:
+        """
+        Lista haseł [start_idx, start_idx + count) liczona hurtowo: hasło to
+        prefiks + końcówka z gotowej tablicy, więc konwersja indeksu idzie
+        raz na base**k haseł, a nie przy każdym. Do strumieniowania (python -m library).
+        """
+        out: List[str] = []
+        base = self.alphabet.base
+        idx = max(0, int(start_idx))
+        end = min(idx + int(count), self._total)
+        offset = 0
+        for L, cnt in zip(self._lengths, self._counts):
+            if idx >= end:
+                break
+            if idx < offset + cnt:
+                k = 1
+                while k < L and base ** (k + 1) <= SUFFIX_TABLE:
+                    k += 1
+                table = self._suffix_table(k)
+                m = len(table)
+                local, stop = idx - offset, min(end, offset + cnt) - offset
+                while local < stop:
+                    prefix_idx, s = divmod(local, m)
+                    take = min(m - s, stop - local)
+                    prefix = self._digits(prefix_idx, L - k)
+                    out += [prefix + x for x in table[s:s + take]] if prefix else table[s:s + take]
+                    local += take
+                idx = offset + stop
+            offset += cnt
+        return out
+
     class BatchIterator:
         """
         Prawdziwy iterator zwracany przez CoreBruteGenerator.generate().
         Trzyma referencję do generatora i iteruje od start_idx przez 'count' elementów
         (lub do końca przestrzeni).
+        Opcjonalnie co `check_every` kandydatów woła progress(pozycja) i sprawdza
+        token anulowania — w gorącej pętli zostaje jedno porównanie z _limit.
         """
 
-        def __init__(self, core: "CoreBruteGenerator", start_idx: int, count: int):
+        def __init__(self, core: "CoreBruteGenerator", start_idx: int, count: int,
+                     progress: Optional[ProgressCallback] = None,
+                     cancel: Optional[CancellationToken] = None,
+                     check_every: int = CHECK_EVERY):
             self._core = core
             self._current = int(start_idx)
             self._end = min(self._current + int(count), core._total)
+            self._progress = progress
+            self._cancel = cancel
+            self._check_every = check_every
+            self.cancelled = False
+            self._set_limit()
+
+        def _set_limit(self):
+            if self._progress is None and self._cancel is None:
+                self._limit = self._end
+            else:
+                self._limit = min(self._current + self._check_every, self._end)
+
+        def _check(self):
+            if self._progress is not None:
+                self._progress(self._current)
+            if self._cancel is not None and self._cancel.cancelled:
+                self.cancelled = True
+                raise StopIteration
+            if self._current >= self._end:
+                self._progress = None
+                raise StopIteration
+            self._set_limit()
 
         def __iter__(self) -> "CoreBruteGenerator.BatchIterator":
             return self
 
         def __next__(self) -> str:
-            if self._current >= self._end:
-                raise StopIteration
+            if self._current >= self._limit:
+                self._check()
             pwd = self._core._idx_to_password(self._current)
             self._current += 1
             return pwd
 
-    def generate(self, start_idx: int, count: int) -> Iterator[str]:
+    def generate(self, start_idx: int, count: int,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 check_every: int = CHECK_EVERY) -> Iterator[str]:
         """
         Zwraca instancję BatchIterator — prawdziwy obiekt iteratora,
         który leniwie zwraca kolejne hasła zaczynając od start_idx.
         """
         # Zwracamy BatchIterator zamiast anonimowego generatora
-        return CoreBruteGenerator.BatchIterator(self, start_idx, count)
+        return CoreBruteGenerator.BatchIterator(self, start_idx, count, progress, cancel, check_every)
 
 
 class PermutationIterator:
@@ -71,16 +175,27 @@ class PermutationIterator:
     Wrapper iteratora nad CoreBruteGenerator — zachowuje kompatybilność z API maina.
     Implementacja zoptymalizowana: nie tworzy nowego generatora przy każdym __next__(),
     tylko bezpośrednio używa _idx_to_password, co eliminuje nadmiarowy overhead.
+    Działa z każdym obiektem, który ma password_at() (dostęp swobodny) i generate().
     """
 
-    def __init__(self, core_generator: CoreBruteGenerator, start_idx: int = 0, batch_size: int = 1_000_000):
+    def __init__(self, core_generator: CoreBruteGenerator, start_idx: int = 0, batch_size: int = 1_000_000,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 check_every: int = CHECK_EVERY):
         self.core = core_generator
         self.current = int(start_idx)
         self.batch_size = int(batch_size)
         self._total = self.core.total_combinations()
+        self._password_at = getattr(core_generator, "password_at", None) or core_generator._idx_to_password
         # Nie tworzymy wewnętrznego generatora dla pojedynczych elementów,
         # ale możemy wygodnie pobrać większe batch'e przez get_batch().
         self._closed = False
+        # progress/cancel sprawdzane co check_every kandydatów (jak w BatchIterator)
+        self._progress = progress
+        self._cancel = cancel
+        self._check_every = check_every
+        self._next_check = self.current + check_every
+        self.cancelled = False
 
     def __iter__(self) -> "PermutationIterator":
         return self
@@ -90,12 +205,25 @@ class PermutationIterator:
             raise StopIteration
         if self.current >= self._total:
             self._closed = True
+            if self._progress is not None:
+                self._progress(self.current)
             raise StopIteration
+        if self.current >= self._next_check and (self._progress is not None or self._cancel is not None):
+            self._check()
         # Bezpośrednie wywołanie konwersji indeks -> password (wydajne)
-        pwd = self.core._idx_to_password(self.current)
+        pwd = self._password_at(self.current)
         self.current += 1
         return pwd
 
+    def _check(self):
+        if self._progress is not None:
+            self._progress(self.current)
+        if self._cancel is not None and self._cancel.cancelled:
+            self.cancelled = True
+            self._closed = True
+            raise StopIteration
+        self._next_check = self.current + self._check_every
+
     def skip_to(self, idx: int):
         """Przeskocz do konkretnego indeksu."""
         if idx < 0:
@@ -103,6 +231,7 @@ class PermutationIterator:
         if idx >= self._total:
             raise IndexError("skip_to: idx poza zakresem")
         self.current = int(idx)
+        self._next_check = self.current + self._check_every
         self._closed = False
 
     def get_batch(self, size: int) -> Iterator[str]:
@@ -115,6 +244,73 @@ class PermutationIterator:
         # Uwaga: Caller może chcieć zaktualizować self.current po iteracji.
         return self.core.generate(self.current, size)
 
+    def next_chunk(self, size: int) -> List[str]:
+        """
+        Pobierz listę maksymalnie `size` kolejnych haseł i przesuń self.current.
+        Pusta lista oznacza koniec przestrzeni.
+        """
+        if self._closed or self.current >= self._total:
+            return []
+        chunk = list(self.core.generate(self.current, min(size, self._total - self.current)))
+        self.current += len(chunk)
+        return chunk
+
+    def chunks(self, size: int) -> Iterator[List[str]]:
+        """Iteruje po kolejnych paczkach (listach) haseł, przesuwając stan iteratora."""
+        while True:
+            chunk = self.next_chunk(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class GeneratorSlice:
+    """
+    Leniwy widok gen[a:b:step] — nic nie generuje, dopóki po nim nie iterujemy.
+    Trzyma tylko generator i obiekt range z indeksami.
+    """
+
+    def __init__(self, generator: "PasswordGenerator", indices: range):
+        self.generator = generator
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, "GeneratorSlice"]:
+        if isinstance(key, slice):
+            return GeneratorSlice(self.generator, self.indices[key])
+        return self.generator[self.indices[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        r = self.indices
+        if r.step == 1:
+            return iter(self.generator.generate(r.start, len(r)))
+        return (self.generator[i] for i in r)
+
+    def index(self, password: str) -> int:
+        """Pozycja hasła w widoku (ValueError, jeśli go tu nie ma)."""
+        return self.indices.index(self.generator.index(password))
+
+    def __contains__(self, password: str) -> bool:
+        try:
+            self.index(password)
+            return True
+        except ValueError:
+            return False
+
+    def chunks(self, size: int) -> Iterator[List[str]]:
+        it = iter(self)
+        while True:
+            chunk = list(itertools.islice(it, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def __repr__(self) -> str:
+        r = self.indices
+        return f"GeneratorSlice({r.start}:{r.stop}:{r.step}, len={len(r)})"
+
 
 class PasswordGenerator:
     """
@@ -125,21 +321,95 @@ class PasswordGenerator:
       - total_combinations()
       - iterator(...)
     Dzięki temu main może robić `self.generator.strategy.generate(...)` tak jak wcześniej.
+
+    Zachowuje się też jak leniwa sekwencja: len(gen), gen[i], gen[a:b:step]
+    (GeneratorSlice), gen.index(hasło), `hasło in gen` oraz gen.chunks(n).
+    Strategie z dostępem swobodnym (password_at/index_of) robią to w O(1),
+    pozostałe (np. słownik) — przechodząc strumień.
     """
 
     def __init__(self, core_generator: CoreBruteGenerator):
         self.core = core_generator
         # main oczekuje atrybutu `strategy` — ustawiamy go jako alias do siebie
         self.strategy = self
+        # tekstowy opis konfiguracji (ustawiany przez GeneratorFactory.from_spec)
+        self.spec: Optional[str] = None
 
     # --- API strategii ---
-    def generate(self, start_idx: int, count: int) -> Iterator[str]:
+    def generate(self, start_idx: int, count: int,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 check_every: int = CHECK_EVERY) -> Iterator[str]:
         # Delegujemy do CoreBruteGenerator, który teraz zwraca BatchIterator (prawdziwy iterator)
-        return self.core.generate(start_idx, count)
+        if progress is None and cancel is None:
+            return self.core.generate(start_idx, count)
+        return self.core.generate(start_idx, count, progress=progress, cancel=cancel,
+                                  check_every=check_every)
 
     def total_combinations(self, min_len: int = None, max_len: int = None) -> int:
         return self.core.total_combinations(min_len, max_len)
 
+    # --- protokół sekwencji ---
+    def __len__(self) -> int:
+        return self.total_combinations()
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, GeneratorSlice]:
+        if isinstance(key, slice):
+            return GeneratorSlice(self, range(len(self))[key])
+        if key < 0:
+            key += len(self)
+            if key < 0:
+                raise IndexError("Indeks poza zakresem generatora")
+        password_at = getattr(self.core, "password_at", None)
+        if password_at is not None:
+            return password_at(key)
+        for pwd in self.generate(key, 1):
+            return pwd
+        raise IndexError("Indeks poza zakresem generatora")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.generate(0, len(self)))
+
+    def index(self, password: str) -> int:
+        """Odwrotność gen[i]; ValueError, jeśli hasła nie ma w przestrzeni."""
+        index_of = getattr(self.core, "index_of", None)
+        if index_of is not None:
+            return index_of(password)
+        for i, pwd in enumerate(self.generate(0, len(self))):
+            if pwd == password:
+                return i
+        raise ValueError(f"Hasła {password!r} nie ma w generatorze")
+
+    def __contains__(self, password: str) -> bool:
+        try:
+            self.index(password)
+            return True
+        except ValueError:
+            return False
+
+    def chunks(self, size: int, start: int = 0, stop: Optional[int] = None) -> Iterator[List[str]]:
+        """Iteruje po listach `size` kolejnych haseł z zakresu [start, stop)."""
+        if stop is None:
+            stop = len(self)
+        passwords = getattr(self.core, "passwords", None)
+        if passwords is not None:
+            # strategia umie hurtowo — bez przechodzenia kandydat po kandydacie
+            for pos in range(start, stop, size):
+                chunk = passwords(pos, min(size, stop - pos))
+                if not chunk:
+                    return
+                yield chunk
+            return
+        it = iter(self.generate(start, max(0, stop - start)))
+        while True:
+            chunk = list(itertools.islice(it, size))
+            if not chunk:
+                return
+            yield chunk
+
     # --- convenience ---
-    def iterator(self, start_idx: int = 0, batch_size: int = 1_000_000) -> PermutationIterator:
-        return PermutationIterator(self.core, start_idx, batch_size)
+    def iterator(self, start_idx: int = 0, batch_size: int = 1_000_000,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None) -> PermutationIterator:
+        """Iterator ze stanem (skip_to, next_chunk) — wymaga strategii z password_at()."""
+        return PermutationIterator(self.core, start_idx, batch_size, progress=progress, cancel=cancel)
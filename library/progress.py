@@ -0,0 +1,112 @@
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+
+# Co ile kandydatów iteratory wołają callback postępu i sprawdzają anulowanie
+CHECK_EVERY = 4096
+
+ProgressCallback = Callable[[int], None]
+
+
+class CancellationToken:
+    """Token anulowania — jeden wątek woła cancel(), iterator sprawdza go co CHECK_EVERY kandydatów."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class ProgressIterator:
+    """
+    Opakowanie dowolnego iteratora haseł (np. strumienia ze słownika) w ten sam
+    mechanizm co BatchIterator: progress(pozycja) i sprawdzenie tokenu co
+    `check_every` elementów, a nie przy każdym.
+    `pozycja` to globalny indeks następnego kandydata.
+    """
+
+    def __init__(
+        self,
+        iterable: Iterable[str],
+        start_idx: int = 0,
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancellationToken] = None,
+        check_every: int = CHECK_EVERY,
+    ):
+        self._it = iter(iterable)
+        self._current = int(start_idx)
+        self._progress = progress
+        self._cancel = cancel
+        self._check_every = check_every
+        self._limit = self._current + check_every
+        self.cancelled = False
+
+    def __iter__(self) -> "ProgressIterator":
+        return self
+
+    def __next__(self) -> str:
+        if self._current >= self._limit:
+            self._check()
+        try:
+            pwd = next(self._it)
+        except StopIteration:
+            if self._progress is not None:
+                self._progress(self._current)
+                self._progress = None
+            raise
+        self._current += 1
+        return pwd
+
+    def _check(self):
+        if self._progress is not None:
+            self._progress(self._current)
+        if self._cancel is not None and self._cancel.cancelled:
+            self.cancelled = True
+            raise StopIteration
+        self._limit = self._current + self._check_every
+
+
+class RateEstimator:
+    """
+    Kroczące tempo (kandydaci/s) z ostatnich `window` sekund i ETA
+    do końca przestrzeni o rozmiarze `total` (np. total_combinations()).
+    update() przyjmuje łączną liczbę zrobionych kandydatów.
+    """
+
+    def __init__(self, total: int, window: float = 10.0, done: int = 0):
+        self.total = total
+        self.window = window
+        self.done = done
+        self._samples = deque([(time.monotonic(), done)])
+
+    def update(self, done: int):
+        now = time.monotonic()
+        self.done = done
+        self._samples.append((now, done))
+        # zostawiamy jedną próbkę starszą niż okno — od niej liczymy tempo
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+
+    def rate(self) -> float:
+        (t0, d0), (t1, d1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return (d1 - d0) / (t1 - t0)
+
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    def eta(self) -> Optional[float]:
+        """Sekundy do końca albo None, gdy tempo jest jeszcze nieznane."""
+        r = self.rate()
+        if r <= 0:
+            return None
+        return max(0, self.total - self.done) / r
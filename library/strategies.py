@@ -1,15 +1,23 @@
 from __future__ import annotations
 import itertools
-from typing import Iterator, Protocol, Any
+from typing import Iterator, List, Optional, Protocol, Any
 from .alphabet import Alphabet
 from .generator import CoreBruteGenerator
+from .compressed import CORRUPT_ERRORS, GzipCheckpointIndex, corrupt_error, open_text, probe
+from .progress import CHECK_EVERY, CancellationToken, ProgressCallback, ProgressIterator
 
 
 class GenerationStrategy(Protocol):
     """Protokół strategii generowania haseł."""
 
-    def generate(self, start_idx: int, count: int) -> Iterator[str]:
-        """Generuje count haseł zaczynając od globalnego indeksu start_idx."""
+    def generate(self, start_idx: int, count: int,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 check_every: int = CHECK_EVERY) -> Iterator[str]:
+        """
+        Generuje count haseł zaczynając od globalnego indeksu start_idx.
+        progress(pozycja) i token anulowania są sprawdzane co check_every kandydatów.
+        """
         ...
 
     def total_combinations(self, min_len: int, max_len: int) -> int:
@@ -30,8 +38,21 @@ class BruteForceStrategy:
     def total_combinations(self, min_len: int = None, max_len: int = None) -> int:
         return self._core.total_combinations(min_len, max_len)
 
-    def generate(self, start_idx: int, count: int) -> Iterator[str]:
-        return self._core.generate(start_idx, count)
+    def generate(self, start_idx: int, count: int,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 check_every: int = CHECK_EVERY) -> Iterator[str]:
+        return self._core.generate(start_idx, count, progress, cancel, check_every)
+
+    # --- dostęp swobodny ---
+    def password_at(self, idx: int) -> str:
+        return self._core.password_at(idx)
+
+    def index_of(self, pwd: str) -> int:
+        return self._core.index_of(pwd)
+
+    def passwords(self, start_idx: int, count: int) -> List[str]:
+        return self._core.passwords(start_idx, count)
 
 
 
@@ -40,6 +61,8 @@ class FileDictionaryStrategy:
     Strategia Słownikowa (File-based):
     Czyta hasła z pliku tekstowego "w locie".
     Nie ładuje całego pliku do pamięci RAM.
+    Obsługuje też słowniki skompresowane (.gz/.bz2/.xz); dla .gz budowany jest
+    indeks punktów kontrolnych, więc generate() nie dekompresuje od początku pliku.
     """
 
     def __init__(self, file_path: str, alphabet: Any = None, min_length: int = 0, max_length: int = 0):
@@ -48,6 +71,17 @@ class FileDictionaryStrategy:
         # a my szukamy min_length=5, to generator powinien je pominąć.
         self.min_length = min_length
         self.max_length = max_length
+        self._gz_index = None
+        # uszkodzony plik / zły format zgłaszamy od razu (ValueError), a nie w wątku liczącym
+        try:
+            probe(file_path)
+        except FileNotFoundError:
+            pass
+        if file_path.endswith(".gz"):
+            self._gz_index = GzipCheckpointIndex(file_path, self._accept)
+
+    def _accept(self, word: str) -> bool:
+        return self.min_length <= len(word) <= self.max_length
 
     def _get_generator(self) -> Iterator[str]:
         """
@@ -56,9 +90,13 @@ class FileDictionaryStrategy:
         Dzięki 'yield' Python pamięta wskaźnik pliku i nie czyta wszystkiego naraz.
         """
         try:
+            if self._gz_index is not None:
+                yield from self._gz_index.words_from(0)
+                return
             # encoding='utf-8' jest standardem, errors='ignore' zapobiegnie wywaleniu programu
             # jeśli w pliku trafi się jakiś dziwny, uszkodzony znak.
-            with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            # open_text rozpoznaje po rozszerzeniu pliki .gz/.bz2/.xz.
+            with open_text(self.file_path) as f:
                 for line in f:
                     # split() domyślnie dzieli po białych znakach (spacja, tab, enter).
                     # To idealnie pasuje do Twojego pliku oddzielonego spacjami.
@@ -70,21 +108,40 @@ class FileDictionaryStrategy:
         except FileNotFoundError:
             # Pusty generator w razie błędu pliku
             return
+        except CORRUPT_ERRORS as e:
+            # np. ucięty .bz2/.xz — wychodzi dopiero przy czytaniu dalszej części pliku
+            raise corrupt_error(self.file_path, e) from None
 
     def total_combinations(self, min_len: int = None, max_len: int = None) -> int:
         """
         Niestety, aby policzyć elementy w strumieniu, musimy go "przejść".
         To może chwilę potrwać przy 10mln haseł, ale nie zużyje pamięci.
+        Dla .gz wynik jest zapamiętywany w indeksie (i przy okazji indeks się buduje).
         """
+        if self._gz_index is not None:
+            try:
+                return len(self._gz_index)
+            except FileNotFoundError:
+                return 0
         lines = sum(1 for _ in self._get_generator())
         return lines
 
-    def generate(self, start_idx: int, count: int) -> Iterator[str]:
+    def generate(self, start_idx: int, count: int,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 check_every: int = CHECK_EVERY) -> Iterator[str]:
         """
         Tu dzieje się magia optymalizacji.
         Używamy itertools.islice, aby przesunąć wirtualny wskaźnik
         do start_idx, a potem pobrać tylko 'count' elementów.
         """
+        if progress is not None or cancel is not None:
+            return ProgressIterator(self.generate(start_idx, count), start_idx, progress, cancel, check_every)
+
+        if self._gz_index is not None:
+            # wznawiamy dekompresję od najbliższego punktu kontrolnego przed start_idx
+            return self._gz_words(start_idx, count)
+
         generator = self._get_generator()
         
         # islice(iterable, start, stop)
@@ -97,4 +154,10 @@ class FileDictionaryStrategy:
         # print(list(itertools.islice(generator, start_idx, start_idx + 10)))
         # # if passwords are empty, stop the program
 
-        return passwords
\ No newline at end of file
+        return passwords
+
+    def _gz_words(self, start_idx: int, count: int) -> Iterator[str]:
+        try:
+            yield from itertools.islice(self._gz_index.words_from(start_idx), count)
+        except FileNotFoundError:
+            return